@@ -0,0 +1,116 @@
+import os
+import glob
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+from Labels import LabelClassifier
+from Proteome_store import load_proteome
+from Site_keys import SiteCodec
+from Site_mapping import SiteMapper
+from Site_redox import META_COLS, run_site_redox, export_tables
+from Table_store import output_path_for, write_tables
+
+# Per-process proteome, mapper index, codec and label classifier. Filled in the parent before the pool
+# starts, so forked workers inherit them; spawned workers rebuild them once each.
+_worker_state = {}
+
+
+# === Helpers ===
+def expand_paths(tsv_paths):
+    """Accept one glob pattern, or a list of paths and/or patterns."""
+    if isinstance(tsv_paths, str):
+        tsv_paths = [tsv_paths]
+    expanded = []
+    for pattern in tsv_paths:
+        matches = sorted(glob.glob(pattern))
+        expanded.extend(matches if matches else [pattern])
+    return list(dict.fromkeys(expanded))
+
+
+def experiment_name(tsv_path):
+    name = os.path.basename(tsv_path)
+    for suffix in ('.tsv', '.pr_matrix'):
+        name = name[:-len(suffix)] if name.endswith(suffix) else name
+    return name
+
+
+def check_unique_names(tsv_paths):
+    """Experiments are keyed (and written) by file name, so two inputs may not share one."""
+    seen = {}
+    for path in tsv_paths:
+        seen.setdefault(experiment_name(path), []).append(path)
+    clashes = {name: paths for name, paths in seen.items() if len(paths) > 1}
+    if clashes:
+        details = '; '.join(f"{name}: {', '.join(paths)}" for name, paths in clashes.items())
+        raise ValueError(f"Inputs share an experiment name, rename them first ({details})")
+
+
+def _init_worker(fasta_path):
+    if 'store' not in _worker_state:
+        store = load_proteome(fasta_path)
+        _worker_state.update(store=store, mapper=SiteMapper(store), codec=SiteCodec.from_store(store),
+                             labels=LabelClassifier())
+
+
+def _process_file(tsv_path, output_dir, output_format):
+    store, mapper, codec = _worker_state['store'], _worker_state['mapper'], _worker_state['codec']
+    name = experiment_name(tsv_path)
+    # The classifier cache carries over between files handled by the same worker
+    tables = run_site_redox(tsv_path, store, site_mapper=mapper, site_codec=codec,
+                            label_classifier=_worker_state['labels'])
+    export_tables(tables, os.path.join(output_dir, name), output_format, codec)
+    return name, tables['Redox Site Summary']
+
+
+# === Cross-experiment merge ===
+def merge_site_tables(site_tables):
+    """Outer-join per-experiment % oxidation on Site_Key; sample columns become '<experiment>:<sample>'."""
+    metadata = pd.concat([t[META_COLS] for t in site_tables.values()]).drop_duplicates(subset='Site_Key')
+    samples = [
+        t.drop(columns=META_COLS).set_index(t['Site_Key']).add_prefix(f"{name}:")
+        for name, t in site_tables.items()
+    ]
+    merged = pd.concat(samples, axis=1, join='outer')
+    return metadata.set_index('Site_Key').join(merged, how='left').reset_index()
+
+
+# === Batch runner ===
+def run_batch(tsv_paths, fasta_path, output_dir, n_workers=None, output_format='parquet'):
+    tsv_paths = expand_paths(tsv_paths)
+    check_unique_names(tsv_paths)
+    os.makedirs(output_dir, exist_ok=True)
+
+    # Compile (if needed) and index the proteome once, before any worker starts
+    _init_worker(fasta_path)
+    codec = _worker_state['codec']
+
+    site_tables = {}
+    with ProcessPoolExecutor(max_workers=n_workers, initializer=_init_worker, initargs=(fasta_path,)) as pool:
+        futures = {pool.submit(_process_file, path, output_dir, output_format): path for path in tsv_paths}
+        for future in as_completed(futures):
+            name, site_df = future.result()
+            site_tables[name] = site_df
+            print(f"✅ {name} done ({len(site_tables)}/{len(tsv_paths)})")
+
+    # Keep input order in the merged table regardless of completion order
+    site_tables = {experiment_name(p): site_tables[experiment_name(p)] for p in tsv_paths}
+    merged = merge_site_tables(site_tables)
+    merged['Site_Key'] = codec.to_strings(merged['Site_Key'])
+    merged_path = output_path_for(os.path.join(output_dir, 'merged_sites'), output_format)
+    if output_format == 'xlsx':
+        merged.to_excel(merged_path, index=False)
+    else:
+        write_tables({'Merged Redox Sites': merged}, merged_path, fmt=output_format)
+    return merged
+
+
+if __name__ == '__main__':
+    # --- CONFIG ---
+    tsv_paths = '/content/pr_matrices/*.pr_matrix.tsv'  # glob pattern or list of paths
+    fasta_path = '/content/uniprotkb_human_AND_model_organism_9606_2024_08_16.fasta.gz'
+    output_dir = '/content/batch_redox'
+    output_format = 'parquet'  # 'parquet', 'feather' or 'xlsx'
+    n_workers = os.cpu_count()
+
+    merged = run_batch(tsv_paths, fasta_path, output_dir, n_workers=n_workers, output_format=output_format)
+    print(f"✅ Merged {len(merged)} sites across experiments into: {output_dir}")
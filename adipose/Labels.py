@@ -0,0 +1,57 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+# Label name -> tag searched for in Modified.Sequence. Order is priority: a peptide
+# carrying several tags gets the first one listed (NEM_L before NEM_H).
+NEM_TAGS = {'NEM_L': 'NEM_L', 'NEM_H': 'NEM_H'}
+UNLABELED = 'Unlabeled'
+
+
+# === Label classifier ===
+class LabelClassifier:
+    """Column-at-a-time isotopic-label classification of modified sequences.
+
+    Each distinct modified sequence is classified once and cached, so repeated calls
+    (precursor table, exploded site table, further files) only look at new sequences.
+    """
+
+    def __init__(self, tags=NEM_TAGS, unlabeled=UNLABELED):
+        self.tags = dict(tags)
+        self.unlabeled = unlabeled
+        self.levels = list(self.tags) + [unlabeled]
+        self._labels = pd.Series(dtype=object)
+
+    def _update_cache(self, uniques):
+        new = uniques[~uniques.isin(self._labels.index)]
+        if len(new) == 0:
+            return
+        labels = np.full(len(new), self.unlabeled, dtype=object)
+        undecided = np.ones(len(new), dtype=bool)
+        for label, tag in self.tags.items():
+            hit = undecided & new.str.contains(tag, regex=False).to_numpy()
+            labels[hit] = label
+            undecided &= ~hit
+        self._labels = pd.concat([self._labels, pd.Series(labels, index=new.to_numpy())])
+
+    def classify(self, modified_sequences):
+        """Label for every row as a categorical Series (missing sequences are unlabeled)."""
+        modified_sequences = pd.Series(modified_sequences)
+        codes, uniques = pd.factorize(modified_sequences.astype(object))
+        uniques = pd.Series(uniques, dtype=object)
+        self._update_cache(uniques)
+        unique_labels = np.append(self._labels.reindex(uniques).to_numpy(dtype=object), self.unlabeled)
+        return pd.Series(pd.Categorical(unique_labels[codes], categories=self.levels),
+                         index=modified_sequences.index)
+
+    def label_counts(self, modified_sequences):
+        """Per-row count of each tag, i.e. labelled Cys residues per label on multi-Cys peptides."""
+        modified_sequences = pd.Series(modified_sequences)
+        codes, uniques = pd.factorize(modified_sequences.astype(object))
+        uniques = pd.Series(uniques, dtype=object)
+        counts = {}
+        for label, tag in self.tags.items():
+            per_unique = np.append(uniques.str.count(re.escape(tag)).to_numpy(), 0)
+            counts[label] = per_unique[codes].astype(np.int64)
+        return pd.DataFrame(counts, index=modified_sequences.index)
@@ -0,0 +1,115 @@
+import sys
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+# DIA-NN pr_matrix: 11 precursor metadata columns, then one intensity column per run
+N_METADATA = 11
+CATEGORICAL_COLS = ['Protein.Group', 'Protein.Ids', 'Protein.Names', 'Genes', 'First.Protein.Description']
+
+
+# === Column helpers ===
+def clean_sample_name(col):
+    return col.split('\\')[-1].split('/')[-1].replace('.raw', '').replace('.mzML', '')
+
+
+def read_header(path, n_metadata=N_METADATA):
+    columns = list(pd.read_csv(path, sep='\t', nrows=0).columns)
+    return columns[:n_metadata], columns[n_metadata:]
+
+
+def _select(path, columns, samples, n_metadata, clean_names):
+    metadata_cols, raw_sample_cols = read_header(path, n_metadata)
+    if columns is not None:
+        metadata_cols = [c for c in metadata_cols if c in set(columns)]
+    if samples is not None:
+        wanted = set(samples)
+        raw_sample_cols = [c for c in raw_sample_cols if c in wanted or clean_sample_name(c) in wanted]
+    dtype = {c: 'category' for c in metadata_cols if c in CATEGORICAL_COLS}
+    dtype.update({c: np.float32 for c in raw_sample_cols})
+    renames = {c: clean_sample_name(c) for c in raw_sample_cols} if clean_names else {}
+    return metadata_cols, raw_sample_cols, dtype, renames
+
+
+# === Readers ===
+def iter_pr_matrix(path, chunksize=100_000, columns=None, samples=None,
+                   n_metadata=N_METADATA, clean_names=True):
+    """Yield pr_matrix chunks with categorical protein/gene columns and float32 intensities."""
+    metadata_cols, raw_sample_cols, dtype, renames = _select(path, columns, samples, n_metadata, clean_names)
+    reader = pd.read_csv(path, sep='\t', usecols=metadata_cols + raw_sample_cols,
+                         dtype=dtype, chunksize=chunksize)
+    for chunk in reader:
+        yield chunk[metadata_cols + raw_sample_cols].rename(columns=renames)
+
+
+def concat_chunks(chunks, categorical_cols):
+    """Stack pr_matrix chunks column by column, unifying each chunk's categories.
+
+    Chunks are split into per-column copies as they arrive, and each column is joined
+    and its pieces dropped before the next, so at most one column is held twice and
+    categoricals never pass through object.
+    """
+    pieces = {}
+    for chunk in chunks:
+        for col in chunk.columns:
+            pieces.setdefault(col, []).append(chunk[col].copy())
+    columns = {}
+    for col in list(pieces):
+        parts = pieces.pop(col)
+        if col in categorical_cols:
+            columns[col] = union_categoricals(parts, sort_categories=True)
+        else:
+            columns[col] = pd.concat(parts, ignore_index=True)
+        del parts
+    return pd.DataFrame(columns, copy=False)
+
+
+def read_pr_matrix(path, columns=None, samples=None, chunksize=None, engine='pyarrow',
+                   n_metadata=N_METADATA, clean_names=True, report=True):
+    """Load a DIA-NN pr_matrix TSV with only the columns a stage needs.
+
+    `columns` restricts the metadata columns and `samples` the runs (raw or cleaned
+    names); None keeps all. Protein and gene columns become categoricals and
+    intensities float32. With `chunksize` the file is streamed through the C parser
+    chunk by chunk, otherwise it is parsed in one multithreaded pyarrow pass.
+    Returns (df, metadata_cols, sample_cols).
+    """
+    metadata_cols, raw_sample_cols, dtype, renames = _select(path, columns, samples, n_metadata, clean_names)
+    if chunksize is not None:
+        chunks = iter_pr_matrix(path, chunksize, columns, samples, n_metadata, clean_names)
+        df = concat_chunks(chunks, [c for c, t in dtype.items() if t == 'category'])
+    else:
+        df = pd.read_csv(path, sep='\t', usecols=metadata_cols + raw_sample_cols, dtype=dtype, engine=engine)
+        df = df[metadata_cols + raw_sample_cols].rename(columns=renames)
+    sample_cols = [renames.get(c, c) for c in raw_sample_cols]
+    if report:
+        report_memory(df, sample_cols)
+    return df, metadata_cols, sample_cols
+
+
+# === Memory report ===
+def naive_memory_bytes(df, sample_cols):
+    """Deep memory the same frame would take as a bare read_csv (float64 + object strings)."""
+    total = df.index.memory_usage()
+    for col in df.columns:
+        series = df[col]
+        if col in sample_cols:
+            total += 8 * len(series)
+        elif isinstance(series.dtype, pd.CategoricalDtype):
+            sizes = np.array([sys.getsizeof(v) for v in series.cat.categories], dtype=np.int64)
+            counts = np.bincount(series.cat.codes[series.cat.codes >= 0], minlength=len(sizes))
+            total += 8 * len(series) + int(sizes @ counts)
+        elif pd.api.types.is_numeric_dtype(series.dtype):
+            total += series.memory_usage(index=False)
+        else:
+            total += 8 * len(series) + sum(map(sys.getsizeof, series.dropna()))
+    return total
+
+
+def report_memory(df, sample_cols):
+    used = df.memory_usage(index=True, deep=True).sum()
+    naive = naive_memory_bytes(df, sample_cols)
+    saved = 100 * (1 - used / naive) if naive else 0.0
+    print(f"📦 Loaded {len(df)} precursors x {len(sample_cols)} runs: {used / 1e6:.1f} MB "
+          f"(naive load ≈ {naive / 1e6:.1f} MB, saved {saved:.0f}%)")
@@ -0,0 +1,134 @@
+import os
+import gzip
+import json
+import hashlib
+from collections.abc import Mapping
+
+import numpy as np
+
+STORE_VERSION = 1
+SEPARATOR = b'#'
+# Trailing separators so fixed-width k-mer scans (see Site_mapping) never run off the end
+TAIL_PAD = 12
+
+
+# === Helpers ===
+def file_sha256(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as handle:
+        for chunk in iter(lambda: handle.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def default_store_dir(fasta_path):
+    return fasta_path + '.store'
+
+
+def _store_paths(store_dir):
+    return {
+        'residues': os.path.join(store_dir, 'residues.bin'),
+        'index': os.path.join(store_dir, 'index.npz'),
+        'manifest': os.path.join(store_dir, 'manifest.json'),
+    }
+
+
+# === Compiler ===
+def compile_proteome(fasta_path, store_dir=None):
+    """Parse a (gzipped) UniProt FASTA once into a residue buffer + offset index."""
+    from Bio import SeqIO
+
+    store_dir = store_dir or default_store_dir(fasta_path)
+    os.makedirs(store_dir, exist_ok=True)
+    paths = _store_paths(store_dir)
+
+    opener = gzip.open if fasta_path.endswith('.gz') else open
+    accessions, lengths, chunks = [], [], []
+    with opener(fasta_path, 'rt') as handle:
+        for record in SeqIO.parse(handle, 'fasta'):
+            prot_id = record.id.split('|')[1] if '|' in record.id else record.id
+            seq = str(record.seq).encode('ascii')
+            accessions.append(prot_id)
+            lengths.append(len(seq))
+            chunks.append(seq)
+
+    buffer = SEPARATOR.join(chunks) + SEPARATOR * TAIL_PAD
+    lengths = np.array(lengths, dtype=np.int64)
+    starts = np.concatenate([[0], np.cumsum(lengths + 1)[:-1]]).astype(np.int64)
+    residues = np.frombuffer(buffer, dtype=np.uint8)
+    is_cys = np.concatenate([[0], np.cumsum(residues == ord('C'))])
+    cys_counts = (is_cys[starts + lengths] - is_cys[starts]).astype(np.int32)
+
+    # Manifest is written last: its presence marks a complete store
+    if os.path.exists(paths['manifest']):
+        os.remove(paths['manifest'])
+    with open(paths['residues'], 'wb') as out:
+        out.write(buffer)
+    np.savez(paths['index'], accessions=np.array(accessions, dtype=str),
+             starts=starts, lengths=lengths, cys_counts=cys_counts)
+    manifest = {
+        'version': STORE_VERSION,
+        'fasta_path': os.path.abspath(fasta_path),
+        'fasta_sha256': file_sha256(fasta_path),
+        'n_proteins': len(accessions),
+        'n_residues': int(lengths.sum()),
+    }
+    with open(paths['manifest'], 'w') as out:
+        json.dump(manifest, out, indent=2)
+    return store_dir
+
+
+def load_proteome(fasta_path, store_dir=None):
+    """Memory-map the compiled store, (re)compiling it if missing or stale."""
+    store_dir = store_dir or default_store_dir(fasta_path)
+    manifest_path = _store_paths(store_dir)['manifest']
+    stale = True
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as handle:
+            manifest = json.load(handle)
+        stale = (manifest.get('version') != STORE_VERSION
+                 or manifest.get('fasta_sha256') != file_sha256(fasta_path))
+    if stale:
+        print(f"🧬 Compiling proteome store for {fasta_path}...")
+        compile_proteome(fasta_path, store_dir)
+    return ProteomeStore(store_dir)
+
+
+# === Store ===
+class ProteomeStore(Mapping):
+    """Read-only accession -> sequence mapping backed by a memory-mapped residue buffer.
+
+    Behaves like the `protein_sequences` dict it replaces; sequences are decoded on access.
+    """
+
+    def __init__(self, store_dir):
+        paths = _store_paths(store_dir)
+        self.store_dir = store_dir
+        with open(paths['manifest']) as handle:
+            self.manifest = json.load(handle)
+        index = np.load(paths['index'])
+        self.accessions = index['accessions']
+        self.starts = index['starts']
+        self.lengths = index['lengths']
+        self.cys_counts = index['cys_counts']
+        self.residues = np.memmap(paths['residues'], dtype=np.uint8, mode='r')
+        self._position = {acc: i for i, acc in enumerate(self.accessions.tolist())}
+
+    def index_of(self, accession):
+        return self._position[accession]
+
+    def sequence_at(self, i):
+        start = self.starts[i]
+        return self.residues[start:start + self.lengths[i]].tobytes().decode('ascii')
+
+    def __getitem__(self, accession):
+        return self.sequence_at(self._position[accession])
+
+    def __contains__(self, accession):
+        return accession in self._position
+
+    def __iter__(self):
+        return iter(self.accessions.tolist())
+
+    def __len__(self):
+        return len(self.accessions)
@@ -1,9 +1,11 @@
-import pandas as pd
 import numpy as np
 import re
+from Table_store import load_table, write_tables
 
-# Load the data
-df = pd.read_excel("/content/cys_summary_with_sites.xlsx", sheet_name="Redox Site Summary")
+# Load the data (Site_redox table-store directory, or a legacy .xlsx workbook)
+input_path = "/content/cys_summary_with_sites"
+output_path = "/content/fully_complete_redox_matrix"  # table-store directory ('.xlsx' suffix for a workbook)
+df = load_table(input_path, "Redox Site Summary")
 
 # Step 1: Identify all replicate columns
 sample_cols = [col for col in df.columns if col.startswith("James_Twin")]
@@ -46,4 +48,7 @@ print(f"✅ 100% complete proteins across all biological samples: {fully_quant_p
 
 # Optional: Save the fully complete data matrix
 merged_complete_df = merged_df.loc[complete_rows, ["Site_Key", "Protein.Ids"] + bio_sample_cols]
-merged_complete_df.to_excel("/content/fully_complete_redox_matrix.xlsx", index=False)
+if output_path.endswith(".xlsx"):
+    merged_complete_df.to_excel(output_path, sheet_name="Fully Complete Matrix", index=False)
+else:
+    write_tables({"Fully Complete Matrix": merged_complete_df}, output_path)
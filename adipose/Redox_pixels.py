@@ -1,10 +1,11 @@
-import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 import math
+from Table_store import load_table
 
 # === Load matrix ===
-df = pd.read_excel("/content/fully_complete_redox_matrix.xlsx")
+input_path = "/content/fully_complete_redox_matrix"  # Redox_complete table-store directory or .xlsx
+df = load_table(input_path, "Fully Complete Matrix")
 df_numeric = df.select_dtypes(include=["number"])  # Only sample columns
 
 # === Parameters ===
@@ -0,0 +1,50 @@
+import numpy as np
+
+LABELS = ['NEM_L', 'NEM_H']
+
+
+# === Site x sample x label tensor ===
+def site_label_tensor(site_codes, label_codes, intensities, n_sites, n_labels=len(LABELS)):
+    """Sum precursor intensities into a dense sites x samples x labels array.
+
+    `site_codes` / `label_codes` give each row's site index and label index.
+    Missing intensities count as 0 (as in a groupby sum); `present` (sites x labels)
+    marks which site/label groups have any rows at all.
+    """
+    site_codes = np.asarray(site_codes, dtype=np.int64)
+    label_codes = np.asarray(label_codes, dtype=np.int64)
+    intensities = np.asarray(intensities)
+    n_samples = intensities.shape[1]
+    tensor = np.zeros((n_sites, n_samples, n_labels), dtype=np.result_type(intensities.dtype, np.float32))
+    present = np.zeros((n_sites, n_labels), dtype=bool)
+    if len(site_codes) == 0:
+        return tensor, present
+
+    # Sort rows by (site, label) once and reduce every group for all samples together
+    group = site_codes * n_labels + label_codes
+    order = np.argsort(group, kind='stable')
+    sorted_group = group[order]
+    bounds = np.flatnonzero(np.r_[True, sorted_group[1:] != sorted_group[:-1]])
+    sums = np.add.reduceat(np.nan_to_num(intensities[order], nan=0.0), bounds, axis=0, dtype=np.float64)
+    keys = sorted_group[bounds]
+    tensor[keys // n_labels, :, keys % n_labels] = sums
+    present[keys // n_labels, keys % n_labels] = True
+    return tensor, present
+
+
+# === % oxidation ===
+def percent_oxidation(tensor, present):
+    """H / (L + H) * 100 for every site and sample in one broadcast.
+
+    Sites seen only as H are 100 % oxidised, only as L 0 %, and neither NaN.
+    """
+    L = tensor[:, :, 0].astype(np.float64)
+    H = tensor[:, :, 1].astype(np.float64)
+    has_L = present[:, 0][:, None]
+    has_H = present[:, 1][:, None]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        pct_ox = H / (L + H) * 100
+    pct_ox = np.where(~has_L & has_H, 100.0, pct_ox)
+    pct_ox = np.where(has_L & ~has_H, 0.0, pct_ox)
+    pct_ox = np.where(~has_L & ~has_H, np.nan, pct_ox)
+    return pct_ox
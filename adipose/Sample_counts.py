@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+
+LABEL_TYPES = ['NEM_L', 'NEM_H', 'Unlabeled']
+
+
+# === Presence matrix ===
+def presence_matrix(df, sample_cols, row_mask=None):
+    """Boolean rows x samples matrix of detections, optionally restricted to `row_mask` rows."""
+    presence = df[sample_cols].notna().to_numpy()
+    if row_mask is not None:
+        presence = presence & np.asarray(row_mask, dtype=bool)[:, None]
+    return presence
+
+
+# === Reductions ===
+def unique_counts_per_sample(keys, presence):
+    """Number of distinct `keys` detected in each sample column of `presence`."""
+    codes, uniques = pd.factorize(pd.Series(keys))
+    valid = codes >= 0
+    codes, presence = codes[valid], presence[valid]
+    if len(codes) == 0:
+        return np.zeros(presence.shape[1], dtype=np.int64)
+    # Sort rows by key once, then OR-reduce every key block for all samples together
+    order = np.argsort(codes, kind='stable')
+    sorted_codes = codes[order]
+    bounds = np.flatnonzero(np.r_[True, sorted_codes[1:] != sorted_codes[:-1]])
+    seen = np.logical_or.reduceat(presence[order], bounds, axis=0)
+    return seen.sum(axis=0)
+
+
+def category_counts_per_sample(categories, presence, levels):
+    """levels x samples matrix of detected-row counts per category."""
+    codes = pd.Categorical(categories, categories=levels).codes
+    return np.stack([presence[codes == k].sum(axis=0) for k in range(len(levels))]).astype(np.int64)
+
+
+# === Tables ===
+def cys_summary(df, sample_cols, has_cys_col='HasCys'):
+    """Unique Cys sequences and precursors per sample from one presence matrix."""
+    presence = presence_matrix(df, sample_cols, df[has_cys_col])
+    return pd.DataFrame({
+        'Sample': sample_cols,
+        'Unique Cys-Seqs': unique_counts_per_sample(df['Stripped.Sequence'], presence),
+        'Unique Cys-Precursors': unique_counts_per_sample(df['Peptide_Key'], presence),
+    })
+
+
+def labeling_efficiency(df, sample_cols, label_col='LabelType', has_cys_col='HasCys', levels=LABEL_TYPES):
+    """Precursor counts per label and % Labeled for every sample at once.
+
+    `levels` are the label columns with the unlabeled level last, as in LabelClassifier.levels.
+    """
+    levels = list(levels)
+    presence = presence_matrix(df, sample_cols, df[has_cys_col])
+    counts = category_counts_per_sample(df[label_col], presence, levels)
+    efficiency_table = pd.DataFrame(counts.T, columns=levels)
+    efficiency_table.insert(0, 'Sample', sample_cols)
+    labeled = efficiency_table[levels[:-1]].sum(axis=1)
+    efficiency_table['% Labeled'] = 100 * labeled / (labeled + efficiency_table[levels[-1]])
+    return efficiency_table.sort_values(by='% Labeled', ascending=False).reset_index(drop=True)
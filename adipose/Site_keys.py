@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+
+# int64 site key: protein index in the high bits, 1-based residue position in the low 32
+POSITION_BITS = 32
+POSITION_MASK = (1 << POSITION_BITS) - 1
+
+
+# === Raw packing ===
+def encode_sites(protein_index, positions):
+    protein_index = np.asarray(protein_index, dtype=np.int64)
+    positions = np.asarray(positions, dtype=np.int64)
+    return (protein_index << POSITION_BITS) | positions
+
+
+def decode_sites(keys):
+    keys = np.asarray(keys, dtype=np.int64)
+    return keys >> POSITION_BITS, keys & POSITION_MASK
+
+
+# === Codec ===
+class SiteCodec:
+    """Vectorized accession/position <-> int64 site-key conversion.
+
+    The protein index is the accession's position in `accessions`; build the codec
+    from the proteome store so keys agree across every stage that uses that store.
+    """
+
+    def __init__(self, accessions):
+        self.accessions = np.asarray(accessions, dtype=object)
+        self._index = pd.Index(self.accessions)
+
+    @classmethod
+    def from_store(cls, store):
+        return cls(store.accessions)
+
+    def protein_index(self, accessions):
+        idx = self._index.get_indexer(pd.Series(accessions, dtype=object))
+        if (idx < 0).any():
+            missing = pd.Series(accessions, dtype=object)[idx < 0].unique()[:5]
+            raise KeyError(f"Accessions not in site codec: {list(missing)}")
+        return idx
+
+    def encode(self, accessions, positions):
+        return encode_sites(self.protein_index(accessions), positions)
+
+    def decode(self, keys):
+        protein_index, positions = decode_sites(keys)
+        return self.accessions[protein_index], positions
+
+    def to_strings(self, keys, sep='_C'):
+        """Export form, e.g. 'P12345_C42' (the Site_redox Site_Key format)."""
+        accessions, positions = self.decode(keys)
+        return pd.Series(accessions, dtype=object) + sep + pd.Series(positions).astype(str)
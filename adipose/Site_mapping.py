@@ -0,0 +1,136 @@
+import numpy as np
+import pandas as pd
+
+from Proteome_store import ProteomeStore
+
+# Residues are packed 5 bits each into an int64 k-mer code, so k is capped at 12.
+# Code 0 is reserved for the protein separator / non-letters, so no peptide k-mer
+# can ever match across a protein boundary.
+MAX_K = 12
+SEPARATOR = '#'
+
+_LUT = np.zeros(256, dtype=np.int64)
+for _i, _aa in enumerate('ABCDEFGHIJKLMNOPQRSTUVWXYZ'):
+    _LUT[ord(_aa)] = _i + 1
+
+
+# === Helpers ===
+def _encode_kmers(codes, k):
+    """Rolling k-mer codes for every start position of a residue code array."""
+    n = len(codes) - k + 1
+    if n <= 0:
+        return np.empty(0, dtype=np.int64)
+    kmers = np.zeros(n, dtype=np.int64)
+    for j in range(k):
+        kmers = (kmers << 5) | codes[j:j + n]
+    return kmers
+
+
+def _expand_ranges(lo, hi):
+    """Concatenate arange(lo[i], hi[i]) for all i, plus the owning index of each value."""
+    counts = hi - lo
+    owner = np.repeat(np.arange(len(lo)), counts)
+    offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    return owner, np.repeat(lo, counts) + offsets
+
+
+# === Site mapper ===
+class SiteMapper:
+    """k-mer sorted index over a proteome for batched peptide -> Cys site mapping.
+
+    The index is built once; every call to `map_peptides` looks all peptides up in
+    one vectorized pass and returns every occurrence in every protein.
+    """
+
+    def __init__(self, protein_sequences, k=7):
+        self.k = min(k, MAX_K)
+        if isinstance(protein_sequences, ProteomeStore):
+            # Same separator layout, so the memory-mapped buffer is indexed as-is
+            self.accessions = protein_sequences.accessions.astype(object)
+            self.starts = protein_sequences.starts
+            self.lengths = protein_sequences.lengths
+            self.residues = np.asarray(protein_sequences.residues)
+        else:
+            self.accessions = np.array(list(protein_sequences.keys()), dtype=object)
+            seqs = [protein_sequences[a] for a in self.accessions]
+            self.lengths = np.array([len(s) for s in seqs], dtype=np.int64)
+            self.starts = np.concatenate([[0], np.cumsum(self.lengths + 1)[:-1]])
+            # Trailing separators give the last residues a k-mer of their own
+            buffer = (SEPARATOR.join(seqs) + SEPARATOR * self.k).encode('ascii')
+            self.residues = np.frombuffer(buffer, dtype=np.uint8)
+        kmers = _encode_kmers(_LUT[self.residues], self.k)
+        self.order = np.argsort(kmers, kind='stable').astype(np.uint32)
+        self.sorted_kmers = kmers[self.order]
+
+    def map_peptides(self, peptides):
+        """Map unique stripped sequences to all (protein, Cys position) sites.
+
+        Returns one row per Cys residue per occurrence with columns
+        Stripped.Sequence, Protein.Id, Peptide.Start and Cys_Position (1-based).
+        """
+        peptides = pd.unique(pd.Series(peptides, dtype=object).dropna())
+        peptides = np.array(peptides, dtype=object)
+        columns = ['Stripped.Sequence', 'Protein.Id', 'Peptide.Start', 'Cys_Position']
+        if len(peptides) == 0:
+            return pd.DataFrame(columns=columns)
+
+        # Every k-mer starting with a peptide's prefix lies in one contiguous block
+        # of the sorted index; look all blocks up at once
+        pep_len = np.array([len(p) for p in peptides], dtype=np.int64)
+        prefix = np.frombuffer(''.join(p[:self.k].ljust(self.k, SEPARATOR) for p in peptides).encode('ascii'),
+                               dtype=np.uint8).reshape(-1, self.k)
+        lead = np.zeros(len(peptides), dtype=np.int64)
+        for j in range(self.k):
+            lead = (lead << 5) | _LUT[prefix[:, j]]
+        shift = 5 * (self.k - np.minimum(pep_len, self.k))
+        lo = np.searchsorted(self.sorted_kmers, lead, side='left')
+        hi = np.searchsorted(self.sorted_kmers, lead + (np.int64(1) << shift), side='left')
+        pep_idx, cand = _expand_ranges(lo, hi)
+        cand_pos = self.order[cand].astype(np.int64)
+
+        # Verify the full peptide against the buffer, one peptide length at a time
+        keep = np.zeros(len(cand_pos), dtype=bool)
+        cand_len = pep_len[pep_idx]
+        for length in np.unique(cand_len):
+            sel = np.flatnonzero(cand_len == length)
+            in_bounds = cand_pos[sel] + length <= len(self.residues)
+            sel = sel[in_bounds]
+            window = self.residues[cand_pos[sel, None] + np.arange(length)]
+            group = np.flatnonzero(pep_len == length)
+            pep_bytes = np.frombuffer(''.join(peptides[group]).encode('ascii'), np.uint8).reshape(-1, length)
+            lookup = np.full(len(peptides), -1, dtype=np.int64)
+            lookup[group] = np.arange(len(group))
+            keep[sel] = (window == pep_bytes[lookup[pep_idx[sel]]]).all(axis=1)
+        pep_idx, match_pos = pep_idx[keep], cand_pos[keep]
+
+        prot_idx = np.searchsorted(self.starts, match_pos, side='right') - 1
+        start = match_pos - self.starts[prot_idx]
+
+        # Expand each match into its Cys positions
+        cys_offsets = [np.array([i for i, aa in enumerate(p) if aa == 'C'], dtype=np.int64) for p in peptides]
+        n_cys = np.array([len(o) for o in cys_offsets], dtype=np.int64)
+        flat_offsets = np.concatenate(cys_offsets) if len(cys_offsets) else np.empty(0, dtype=np.int64)
+        first = np.cumsum(n_cys) - n_cys
+        match_idx, flat_idx = _expand_ranges(first[pep_idx], first[pep_idx] + n_cys[pep_idx])
+
+        return pd.DataFrame({
+            'Stripped.Sequence': peptides[pep_idx[match_idx]],
+            'Protein.Id': self.accessions[prot_idx[match_idx]],
+            'Peptide.Start': start[match_idx] + 1,
+            'Cys_Position': start[match_idx] + flat_offsets[flat_idx] + 1,
+        }, columns=columns)
+
+
+# === Precursor-level mapping ===
+def map_precursor_sites(df, mapper, seq_col='Stripped.Sequence', protein_col='Protein.Ids'):
+    """One row per precursor x listed protein x Cys site.
+
+    Every accession in a semicolon-separated `protein_col` is considered, and a
+    peptide occurring several times in one protein yields one row per occurrence.
+    """
+    cys_df = df[df[seq_col].str.contains('C', na=False)]
+    sites = mapper.map_peptides(cys_df[seq_col])
+    sites = sites.drop(columns='Peptide.Start').rename(columns={'Stripped.Sequence': seq_col})
+    long_df = cys_df.assign(**{'Protein.Id': cys_df[protein_col].astype(str).str.split(';')})
+    long_df = long_df.explode('Protein.Id')
+    return long_df.merge(sites, on=[seq_col, 'Protein.Id'], how='inner')
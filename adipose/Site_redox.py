@@ -1,145 +1,144 @@
 import pandas as pd
 import numpy as np
-import gzip
-from Bio import SeqIO
-
-# --- CONFIG ---
-tsv_path = '/content/new cys test.pr_matrix (2).tsv'
-fasta_path = '/content/uniprotkb_human_AND_model_organism_9606_2024_08_16.fasta.gz'
-output_path = '/content/cys_summary_with_sites.xlsx'
-
-# --- LOAD DIA-NN TSV ---
-df = pd.read_csv(tsv_path, sep='\t')
-metadata_cols = list(df.columns[:11])
-sample_cols = list(df.columns[11:])
-clean_sample_cols = [
-    col.split('\\')[-1].split('/')[-1].replace('.raw', '').replace('.mzML', '')
-    for col in sample_cols
-]
-df.rename(columns=dict(zip(sample_cols, clean_sample_cols)), inplace=True)
-sample_cols = clean_sample_cols
-
-# --- CYS MARKING ---
-df['HasCys'] = df['Stripped.Sequence'].str.contains('C')
-df['Peptide_Key'] = df['Stripped.Sequence'] + '_z' + df['Precursor.Charge'].astype(str)
-
-# --- FASTA PARSING ---
-protein_sequences = {}
-with gzip.open(fasta_path, 'rt') as handle:
-    for record in SeqIO.parse(handle, 'fasta'):
-        prot_id = record.id.split('|')[1] if '|' in record.id else record.id
-        protein_sequences[prot_id] = str(record.seq)
-
-# --- MAP CYSTEINE POSITIONS ---
-def map_peptide_to_sites(row):
-    seq = row['Stripped.Sequence']
-    prot_id = row['Protein.Ids']
-    prot_seq = protein_sequences.get(prot_id)
-    if not prot_seq:
-        return []
-    pos = prot_seq.find(seq)
-    if pos == -1:
-        return []
-    return [pos + i + 1 for i, aa in enumerate(seq) if aa == 'C']
-
-df['Cys_Positions'] = df.apply(map_peptide_to_sites, axis=1)
-df_exploded = df.explode('Cys_Positions')
-df_exploded = df_exploded[df_exploded['Cys_Positions'].notna()]
-df_exploded['Site_Key'] = df_exploded['Protein.Ids'] + '_C' + df_exploded['Cys_Positions'].astype(int).astype(str)
-
-# --- CYS SUMMARY SHEET ---
-unique_cys_seq_counts = {
-    sample: df[(df['HasCys']) & (df[sample].notna())]['Stripped.Sequence'].nunique()
-    for sample in sample_cols
-}
-unique_cys_precursor_counts = {
-    sample: df[(df['HasCys']) & (df[sample].notna())]['Peptide_Key'].nunique()
-    for sample in sample_cols
-}
-summary_df = pd.DataFrame({
-    'Sample': sample_cols,
-    'Unique Cys-Seqs': [unique_cys_seq_counts[s] for s in sample_cols],
-    'Unique Cys-Precursors': [unique_cys_precursor_counts[s] for s in sample_cols]
-})
-
-# --- LABELING EFFICIENCY ---
-def get_label_type(modseq):
-    if pd.isna(modseq):
-        return 'Unlabeled'
-    elif 'NEM_L' in modseq:
-        return 'NEM_L'
-    elif 'NEM_H' in modseq:
-        return 'NEM_H'
-    else:
-        return 'Unlabeled'
-
-df['LabelType'] = df['Modified.Sequence'].apply(get_label_type)
-cys_df = df[df['HasCys']]
-efficiency_table = pd.DataFrame(columns=['Sample', 'NEM_L', 'NEM_H', 'Unlabeled'])
-for sample in sample_cols:
-    sample_data = cys_df[cys_df[sample].notna()]
-    counts = sample_data['LabelType'].value_counts()
-    row = {
-        'Sample': sample,
-        'NEM_L': counts.get('NEM_L', 0),
-        'NEM_H': counts.get('NEM_H', 0),
-        'Unlabeled': counts.get('Unlabeled', 0)
-    }
-    efficiency_table = pd.concat([efficiency_table, pd.DataFrame([row])], ignore_index=True)
-efficiency_table['% Labeled'] = 100 * (efficiency_table['NEM_L'] + efficiency_table['NEM_H']) / \
-                                (efficiency_table['NEM_L'] + efficiency_table['NEM_H'] + efficiency_table['Unlabeled'])
-efficiency_table = efficiency_table.sort_values(by='% Labeled', ascending=False).reset_index(drop=True)
-
-# --- SITE-LEVEL REDOX ---
-df_exploded['Label'] = df_exploded['Modified.Sequence'].apply(get_label_type)
-df_labeled = df_exploded[df_exploded['Label'].isin(['NEM_L', 'NEM_H'])]
-
-grouped = df_labeled.groupby(['Site_Key', 'Label'])[sample_cols].sum().reset_index()
-pivot = grouped.pivot(index='Site_Key', columns='Label', values=sample_cols)
-pivot.columns = [f"{sample}_{label}" for sample, label in pivot.columns]
-pivot.reset_index(inplace=True)
-
-meta_cols = ['Site_Key', 'Protein.Ids', 'Protein.Group', 'Protein.Names', 'Genes', 'First.Protein.Description']
-metadata_df = df_exploded[meta_cols].drop_duplicates(subset='Site_Key')
-merged = pd.merge(metadata_df, pivot, on='Site_Key', how='left')
-
-# Calculate % oxidation
-percent_oxidized = merged[meta_cols].copy()
-for sample in sample_cols:
-    L = merged.get(f"{sample}_NEM_L", pd.Series([np.nan] * len(merged)))
-    H = merged.get(f"{sample}_NEM_H", pd.Series([np.nan] * len(merged)))
-    with np.errstate(divide='ignore', invalid='ignore'):
-        pct_ox = (H / (L + H)) * 100
-        pct_ox[L.isna() & H.notna()] = 100
-        pct_ox[H.isna() & L.notna()] = 0
-        pct_ox[(L.isna()) & (H.isna())] = np.nan
-    percent_oxidized[sample] = pct_ox
-
-# --- CYS SITE COVERAGE ---
-total_cys_per_protein = {pid: seq.count('C') for pid, seq in protein_sequences.items()}
-observed_cys_per_protein = (
-    df_exploded[df_exploded['Site_Key'].notna()]
-    .groupby('Protein.Ids')['Site_Key'].nunique()
-    .to_dict()
-)
-
-coverage_data = []
-for prot_id, total_cys in total_cys_per_protein.items():
-    observed = observed_cys_per_protein.get(prot_id, 0)
-    percent = 100 * observed / total_cys if total_cys > 0 else 0
-    coverage_data.append({
-        'Protein.Ids': prot_id,
+from Labels import LabelClassifier
+from Pr_matrix import read_pr_matrix
+from Proteome_store import load_proteome
+from Redox_tensor import LABELS, site_label_tensor, percent_oxidation
+from Sample_counts import cys_summary, labeling_efficiency
+from Site_keys import SiteCodec, decode_sites
+from Site_mapping import SiteMapper, map_precursor_sites
+from Table_store import output_path_for, write_tables
+
+# Only the metadata this stage uses; categorical protein/gene columns, float32 intensities
+STAGE_COLS = ['Protein.Group', 'Protein.Ids', 'Protein.Names', 'Genes', 'First.Protein.Description',
+              'Stripped.Sequence', 'Modified.Sequence', 'Precursor.Charge']
+META_COLS = ['Site_Key', 'Protein.Ids', 'Protein.Group', 'Protein.Names', 'Genes', 'First.Protein.Description']
+
+
+def _coverage(observed, total):
+    """100 * observed / total, 0 where a protein has no cysteines."""
+    return np.divide(100 * observed, total, out=np.zeros(np.shape(observed)), where=np.asarray(total) > 0)
+
+
+def run_site_redox(tsv_path, protein_sequences, site_mapper=None, site_codec=None, label_classifier=None):
+    """All Site_redox tables for one pr_matrix; Site_Key stays an int64 site key."""
+    site_mapper = site_mapper or SiteMapper(protein_sequences)
+    site_codec = site_codec or SiteCodec.from_store(protein_sequences)
+    label_classifier = label_classifier or LabelClassifier()
+
+    # --- LOAD DIA-NN TSV ---
+    df, metadata_cols, sample_cols = read_pr_matrix(tsv_path, columns=STAGE_COLS)
+
+    # --- CYS MARKING ---
+    df['HasCys'] = df['Stripped.Sequence'].str.contains('C')
+    df['Peptide_Key'] = df['Stripped.Sequence'] + '_z' + df['Precursor.Charge'].astype(str)
+
+    # --- MAP CYSTEINE POSITIONS ---
+    # One indexed pass over all unique Cys peptides; every accession in Protein.Ids
+    # and every repeated occurrence within a protein yields its own site row.
+    df_exploded = map_precursor_sites(df, site_mapper)
+    # Sites are keyed by packed int64 (protein index, position) until export
+    df_exploded['Site_Key'] = site_codec.encode(df_exploded['Protein.Id'], df_exploded['Cys_Position'])
+
+    # --- CYS SUMMARY SHEET ---
+    summary_df = cys_summary(df, sample_cols)
+
+    # --- LABELING EFFICIENCY ---
+    df['LabelType'] = label_classifier.classify(df['Modified.Sequence'])
+    efficiency_table = labeling_efficiency(df, sample_cols, levels=label_classifier.levels)
+
+    # --- SITE-LEVEL REDOX ---
+    df_exploded['Label'] = label_classifier.classify(df_exploded['Modified.Sequence'])
+    df_labeled = df_exploded[df_exploded['Label'].isin(['NEM_L', 'NEM_H'])]
+    metadata_df = df_exploded[META_COLS].drop_duplicates(subset='Site_Key').reset_index(drop=True)
+
+    # Site x sample x {L, H} intensity tensor, then % oxidation for all samples in one broadcast
+    site_codes = pd.Index(metadata_df['Site_Key']).get_indexer(df_labeled['Site_Key'])
+    label_codes = (df_labeled['Label'] == 'NEM_H').to_numpy().astype(np.int64)
+    site_tensor, site_present = site_label_tensor(
+        site_codes, label_codes, df_labeled[sample_cols].to_numpy(), len(metadata_df))
+    pct_ox = percent_oxidation(site_tensor, site_present)
+    percent_oxidized = pd.concat([metadata_df, pd.DataFrame(pct_ox, columns=sample_cols)], axis=1)
+
+    # --- CYS SITE COVERAGE ---
+    # Per-protein Cys totals come precomputed from the store; observed sites are counted
+    # by integer protein index, overall, per label and per sample, without revisiting rows.
+    total_cys = protein_sequences.cys_counts.astype(np.int64)
+    n_proteins = len(total_cys)
+    observed = np.bincount(decode_sites(pd.unique(df_exploded['Site_Key']))[0], minlength=n_proteins)
+    site_protein = decode_sites(metadata_df['Site_Key'])[0]
+
+    coverage_df = pd.DataFrame({
+        'Protein.Ids': protein_sequences.accessions,
         'Total Cysteines': total_cys,
         'Observed Cys Sites': observed,
-        'Cys Site Coverage (%)': percent
+        'Cys Site Coverage (%)': _coverage(observed, total_cys),
     })
-coverage_df = pd.DataFrame(coverage_data)
+    for j, label in enumerate(LABELS):
+        label_observed = np.bincount(site_protein, weights=site_present[:, j], minlength=n_proteins).astype(np.int64)
+        coverage_df[f'Observed {label} Sites'] = label_observed
+        coverage_df[f'{label} Coverage (%)'] = _coverage(label_observed, total_cys)
+
+    # Sites quantified in each sample, summed per observed protein with one sorted reduceat
+    order = np.argsort(site_protein, kind='stable')
+    sorted_protein = site_protein[order]
+    bounds = np.flatnonzero(np.r_[True, sorted_protein[1:] != sorted_protein[:-1]])[:len(order)]
+    proteins_seen = sorted_protein[bounds]
+    per_sample = np.zeros((len(bounds), len(sample_cols)), dtype=np.int64)
+    if len(order):
+        per_sample = np.add.reduceat((~np.isnan(pct_ox[order])).astype(np.int64), bounds, axis=0)
+    sample_coverage_df = pd.concat([
+        pd.DataFrame({
+            'Protein.Ids': protein_sequences.accessions[proteins_seen],
+            'Total Cysteines': total_cys[proteins_seen],
+        }),
+        pd.DataFrame(_coverage(per_sample, total_cys[proteins_seen][:, None]), columns=sample_cols),
+    ], axis=1)
+
+    return {
+        'Cys Summary': summary_df,
+        'Labeling Efficiency': efficiency_table,
+        'Redox Site Summary': percent_oxidized,
+        'Cys Site Coverage': coverage_df,
+        'Cys Coverage by Sample': sample_coverage_df,
+    }
+
 
 # --- EXPORT ---
-with pd.ExcelWriter(output_path, engine='xlsxwriter') as writer:
-    summary_df.to_excel(writer, sheet_name='Cys Summary', index=False)
-    efficiency_table.to_excel(writer, sheet_name='Labeling Efficiency', index=False)
-    percent_oxidized.to_excel(writer, sheet_name='Redox Site Summary', index=False)
-    coverage_df.to_excel(writer, sheet_name='Cys Site Coverage', index=False)
+def export_tables(tables, output_path, output_format, site_codec):
+    """Write the tables, converting int64 Site_Keys to 'P12345_C42' strings on the way out.
+
+    The suffix follows output_format ('.xlsx' workbook or table-store directory); returns the path written.
+    """
+    output_path = output_path_for(output_path, output_format)
+    tables = dict(tables)
+    if 'Redox Site Summary' in tables:
+        site_df = tables['Redox Site Summary'].copy()
+        site_df['Site_Key'] = site_codec.to_strings(site_df['Site_Key'])
+        tables['Redox Site Summary'] = site_df
+    if output_format == 'xlsx':
+        with pd.ExcelWriter(output_path, engine='xlsxwriter') as writer:
+            for sheet_name, table in tables.items():
+                table.to_excel(writer, sheet_name=sheet_name, index=False)
+    else:
+        # Columnar tables + manifest; Table_store.write_xlsx_report(output_path) builds the workbook on demand
+        write_tables(tables, output_path, fmt=output_format)
+    return output_path
+
+
+if __name__ == '__main__':
+    # --- CONFIG ---
+    tsv_path = '/content/new cys test.pr_matrix (2).tsv'
+    fasta_path = '/content/uniprotkb_human_AND_model_organism_9606_2024_08_16.fasta.gz'
+    output_path = '/content/cys_summary_with_sites'  # suffix is set from output_format
+    output_format = 'parquet'  # 'parquet', 'feather' or 'xlsx'
+
+    # --- PROTEOME STORE ---
+    # Compiled once next to the FASTA and memory-mapped afterwards; recompiled when the FASTA changes
+    protein_sequences = load_proteome(fasta_path)
+    site_codec = SiteCodec.from_store(protein_sequences)
+
+    tables = run_site_redox(tsv_path, protein_sequences, site_codec=site_codec)
+    output_path = export_tables(tables, output_path, output_format, site_codec)
 
-print(f"✅ All results saved to: {output_path}")
+    print(f"✅ All results saved to: {output_path}")
@@ -0,0 +1,81 @@
+import os
+import re
+import json
+
+import pandas as pd
+
+FORMATS = {'parquet': '.parquet', 'feather': '.feather'}
+
+
+# === Helpers ===
+def table_slug(name):
+    return re.sub(r'[^0-9a-zA-Z]+', '_', name).strip('_').lower()
+
+
+def output_path_for(path, fmt):
+    """Output location for `fmt`: a '.xlsx' workbook, or a table-store directory (no suffix)."""
+    stem = os.path.splitext(path)[0] if os.path.splitext(path)[1] in ('.xlsx', *FORMATS.values()) else path
+    return stem + '.xlsx' if fmt == 'xlsx' else stem
+
+
+def _manifest_path(out_dir):
+    return os.path.join(out_dir, 'manifest.json')
+
+
+def read_manifest(out_dir):
+    with open(_manifest_path(out_dir)) as handle:
+        return json.load(handle)
+
+
+# === Writer ===
+def write_tables(tables, out_dir, fmt='parquet', compression='zstd'):
+    """Write {sheet name: DataFrame} as one compressed columnar file per table plus a manifest."""
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown table format {fmt!r}; expected one of {sorted(FORMATS)}")
+    os.makedirs(out_dir, exist_ok=True)
+    manifest = {'format': fmt, 'tables': {}}
+    for name, table in tables.items():
+        file_name = table_slug(name) + FORMATS[fmt]
+        path = os.path.join(out_dir, file_name)
+        table = table.reset_index(drop=True)
+        table.columns = [str(c) for c in table.columns]
+        if fmt == 'parquet':
+            table.to_parquet(path, index=False, compression=compression)
+        else:
+            table.to_feather(path, compression=compression)
+        manifest['tables'][name] = {'file': file_name, 'rows': len(table), 'columns': len(table.columns)}
+    with open(_manifest_path(out_dir), 'w') as handle:
+        json.dump(manifest, handle, indent=2)
+    return out_dir
+
+
+# === Readers ===
+def read_table(out_dir, name, columns=None):
+    entry = read_manifest(out_dir)['tables'][name]
+    path = os.path.join(out_dir, entry['file'])
+    if path.endswith('.parquet'):
+        return pd.read_parquet(path, columns=columns)
+    return pd.read_feather(path, columns=columns)
+
+
+def load_table(path, name, columns=None):
+    """Read one table from either a table-store directory or a legacy .xlsx workbook.
+
+    A single-sheet workbook is read whatever its sheet is called (older exports used 'Sheet1').
+    """
+    if path.endswith('.xlsx'):
+        sheets = pd.ExcelFile(path).sheet_names
+        df = pd.read_excel(path, sheet_name=name if name in sheets or len(sheets) > 1 else 0)
+        return df[columns] if columns is not None else df
+    return read_table(path, name, columns=columns)
+
+
+# === Optional xlsx report ===
+def write_xlsx_report(out_dir, xlsx_path=None, names=None):
+    """Build the Excel workbook from the stored tables on demand (one sheet per table)."""
+    xlsx_path = xlsx_path or out_dir.rstrip('/\\') + '.xlsx'
+    names = names or list(read_manifest(out_dir)['tables'])
+    with pd.ExcelWriter(xlsx_path, engine='xlsxwriter') as writer:
+        for name in names:
+            read_table(out_dir, name).to_excel(writer, sheet_name=name[:31], index=False)
+    return xlsx_path
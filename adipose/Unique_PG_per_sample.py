@@ -1,13 +1,11 @@
 import pandas as pd
 import re
+from Pr_matrix import read_pr_matrix
 
 # Load DIA-NN output
 file_path = '/content/new cys test.pr_matrix (2).tsv'
-df = pd.read_csv(file_path, sep='\t')
-
-# Identify metadata and sample columns
-metadata_cols = ['Protein.Group', 'Protein.Ids', 'Protein.Names', 'Genes']
-sample_cols = [col for col in df.columns if col not in metadata_cols and not col.startswith('Unnamed')]
+# Only Protein.Group is needed; run columns keep their raw names for the Twin_<n>_S<k>.raw pattern
+df, metadata_cols, sample_cols = read_pr_matrix(file_path, columns=['Protein.Group'], clean_names=False)
 
 # Extract biological sample number from column names (e.g., 83 from James_Twin_83_S3.raw)
 def extract_sample_number(colname):
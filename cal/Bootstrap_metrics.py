@@ -0,0 +1,118 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+METRICS = ['r2', 'rmse', 'mae', 'mape', 'bias', 'sd']
+MODES = {
+    'MS1': 'Observed_Reduced_MS1',
+    'MS2': 'Observed_Reduced_MS2',
+    'Combined': 'Observed_Reduced_Combined',
+}
+
+
+# === Batched metrics ===
+def batched_metrics(observed, expected):
+    """Every metric along the last axis; any leading (mode, resample) axes are kept.
+
+    Matches the sklearn calls and safe_mape() in Residuals.py: R² is 1 - SS_res/SS_tot
+    (1.0 / 0.0 when the expected values are constant), MAPE skips expected == 0 and SD
+    is the population SD of the residuals.
+    """
+    observed = np.asarray(observed, dtype=np.float64)
+    expected = np.broadcast_to(np.asarray(expected, dtype=np.float64), observed.shape)
+    residuals = observed - expected
+
+    ss_res = np.sum(residuals ** 2, axis=-1)
+    ss_tot = np.sum((expected - expected.mean(axis=-1, keepdims=True)) ** 2, axis=-1)
+    r2 = np.where(ss_tot > 0, 1 - ss_res / np.where(ss_tot > 0, ss_tot, 1), np.where(ss_res == 0, 1.0, 0.0))
+
+    nonzero = expected != 0
+    ape = np.abs(residuals) / np.where(nonzero, np.abs(expected), 1)
+    n_nonzero = nonzero.sum(axis=-1)
+    mape = np.where(n_nonzero > 0, np.sum(ape * nonzero, axis=-1) / np.maximum(n_nonzero, 1), np.nan)
+
+    return {
+        'r2': r2,
+        'rmse': np.sqrt(ss_res / observed.shape[-1]),
+        'mae': np.mean(np.abs(residuals), axis=-1),
+        'mape': mape,
+        'bias': np.mean(residuals, axis=-1),
+        'sd': np.std(residuals, axis=-1),
+    }
+
+
+# === Bootstrap ===
+def resample_indices(n_obs, n_boot=10_000, seed=0):
+    """One (n_boot, n_obs) matrix of row indices, shared by every mode so resamples stay paired."""
+    return np.random.default_rng(seed).integers(0, n_obs, size=(n_boot, n_obs))
+
+
+def _chunk_metrics(observed, expected, indices):
+    # (modes, n_obs) -> (modes, resamples, n_obs) in one gather, then reduce along the last axis
+    stacked = batched_metrics(observed[:, indices], expected[indices])
+    return np.stack([stacked[m] for m in METRICS], axis=-1)
+
+
+def bootstrap_metrics(df, expected_col='Expected_Reduced', modes=MODES, n_boot=10_000, ci=95,
+                      seed=0, n_workers=1, chunk_size=2_000):
+    """Point estimates plus percentile bootstrap CIs for every metric and observation mode.
+
+    Resamples are split into `chunk_size` row blocks of the index matrix; with
+    n_workers > 1 the blocks are reduced in a process pool.
+    """
+    observed = df[list(modes.values())].to_numpy(dtype=np.float64).T
+    expected = df[expected_col].to_numpy(dtype=np.float64)
+    indices = resample_indices(len(expected), n_boot, seed)
+    chunks = [indices[start:start + chunk_size] for start in range(0, n_boot, chunk_size)]
+
+    if n_workers and n_workers > 1:
+        with ProcessPoolExecutor(max_workers=n_workers) as pool:
+            parts = list(pool.map(_chunk_metrics, [observed] * len(chunks), [expected] * len(chunks), chunks))
+    else:
+        parts = [_chunk_metrics(observed, expected, chunk) for chunk in chunks]
+    boot = np.concatenate(parts, axis=1)  # (modes, n_boot, metrics)
+
+    point = batched_metrics(observed, expected)
+    alpha = (100 - ci) / 2
+    low, high = np.nanpercentile(boot, [alpha, 100 - alpha], axis=1)
+    se = np.nanstd(boot, axis=1, ddof=1)
+
+    rows = []
+    for i, mode in enumerate(modes):
+        for j, metric in enumerate(METRICS):
+            rows.append({
+                'Mode': mode,
+                'Metric': metric,
+                'Estimate': point[metric][i],
+                'SE': se[i, j],
+                'CI_Lower': low[i, j],
+                'CI_Upper': high[i, j],
+            })
+    return pd.DataFrame(rows)
+
+
+def print_metrics(ci_df, label, metrics=METRICS, ci=95):
+    names = {'r2': 'R²', 'rmse': 'RMSE', 'mae': 'MAE', 'mape': 'MAPE', 'bias': 'Bias', 'sd': 'SD(residuals)'}
+    print(f"\nMetrics for {label} ({ci}% bootstrap CI):")
+    rows = ci_df[ci_df['Mode'] == label].set_index('Metric')
+    for metric in metrics:
+        row = rows.loc[metric]
+        scale = 100 if metric == 'mape' else 1
+        unit = '%' if metric == 'mape' else ''
+        print(f"  {names[metric]:<6} = {row['Estimate'] * scale:.4f}{unit} "
+              f"[{row['CI_Lower'] * scale:.4f}{unit}, {row['CI_Upper'] * scale:.4f}{unit}]")
+
+
+if __name__ == '__main__':
+    # --- CONFIG ---
+    comparison_path = 'redox_comparison.csv'  # written by Curve.py
+    n_boot = 10_000
+    n_workers = os.cpu_count()
+
+    df = pd.read_csv(comparison_path)
+    ci_df = bootstrap_metrics(df, n_boot=n_boot, n_workers=n_workers)
+    for label in MODES:
+        print_metrics(ci_df, label)
+    ci_df.to_csv('calibration_metrics_ci.csv', index=False)
@@ -0,0 +1,143 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow.compute as pc
+from Report_access import iter_report_batches, read_report, report_dataset
+
+COUNT_COLS = ['Run', 'Total_C_Peptides', 'Light_C', 'Heavy_C', 'Unlabeled_C']
+CACHE_COLS = COUNT_COLS + ['Rows', 'Fingerprint']
+SEQUENCE_COLS = ['Run', 'Stripped.Sequence', 'Modified.Sequence']
+# Label -> tag in Modified.Sequence; the calibration report tags light/heavy NEM as *_L / *_H.
+# Order is priority: a peptide carrying both tags counts as the first one listed.
+CALIBRATION_TAGS = {'L': '_L', 'H': '_H'}
+
+
+# === Label counts (Labelling.py logic) ===
+def classify_labels(modified_sequences, tags=CALIBRATION_TAGS, unlabeled='None'):
+    """Label of every modified sequence; each distinct sequence is checked once."""
+    codes, uniques = pd.factorize(pd.Series(modified_sequences).astype(object))
+    uniques = pd.Series(uniques, dtype=object)
+    labels = np.full(len(uniques) + 1, unlabeled, dtype=object)  # last slot: missing sequences
+    undecided = np.ones(len(uniques), dtype=bool)
+    for label, tag in tags.items():
+        hit = undecided & uniques.str.contains(tag, regex=False).to_numpy()
+        labels[:-1][hit] = label
+        undecided &= ~hit
+    return labels[codes]
+
+
+def label_counts_per_run(df_cys, tags=CALIBRATION_TAGS):
+    """Unique Cys peptides per run split into Light / Heavy / Unlabeled."""
+    df_unique = df_cys.drop_duplicates(subset=['Run', 'Stripped.Sequence'])
+    labels = classify_labels(df_unique['Modified.Sequence'], tags)
+    counts = pd.crosstab(df_unique['Run'].to_numpy(), labels)
+    counts = counts.reindex(columns=['L', 'H', 'None'], fill_value=0)
+    summary = pd.DataFrame({
+        'Run': counts.index,
+        'Total_C_Peptides': counts.sum(axis=1).to_numpy(),
+        'Light_C': counts['L'].to_numpy(),
+        'Heavy_C': counts['H'].to_numpy(),
+    })
+    summary['Unlabeled_C'] = summary['Total_C_Peptides'] - summary['Light_C'] - summary['Heavy_C']
+    return summary[COUNT_COLS]
+
+
+def report_runs(report_path):
+    runs = report_dataset(report_path, columns=['Run']).to_table(columns=['Run']).column('Run')
+    return sorted(pc.unique(runs).to_pylist())
+
+
+def run_fingerprints(report_path, runs):
+    """Cys row count and an order-free hash of the (Stripped, Modified) sequences of each run.
+
+    Streamed from the slim report cache; a run's label counts can only change if its
+    fingerprint does.
+    """
+    rows = dict.fromkeys(runs, 0)
+    hashes = {run: np.uint64(0) for run in runs}
+    for chunk in iter_report_batches(report_path, columns=SEQUENCE_COLS, runs=runs, cys_only=True):
+        codes, chunk_runs = pd.factorize(chunk['Run'])
+        row_hashes = pd.util.hash_pandas_object(chunk[SEQUENCE_COLS[1:]], index=False).to_numpy()
+        chunk_hashes = np.zeros(len(chunk_runs), dtype=np.uint64)
+        np.add.at(chunk_hashes, codes, row_hashes)  # uint64 sums wrap, so order never matters
+        chunk_rows = np.bincount(codes, minlength=len(chunk_runs))
+        for run, n, h in zip(chunk_runs, chunk_rows, chunk_hashes):
+            rows[run] += int(n)
+            hashes[run] = np.uint64(hashes[run] + h)
+    return pd.DataFrame({'Run': list(runs), 'Rows': [rows[run] for run in runs],
+                         'Fingerprint': [str(hashes[run]) for run in runs]})
+
+
+def load_count_cache(cache_path):
+    if os.path.exists(cache_path):
+        cached = pd.read_csv(cache_path, dtype={'Fingerprint': str})
+        if {'Rows', 'Fingerprint'} <= set(cached.columns):
+            return cached[CACHE_COLS]
+    return pd.DataFrame(columns=CACHE_COLS)
+
+
+def cached_label_counts(report_path, cache_path=None, runs=None):
+    """Per-run label counts, computing only runs that are new or changed since the cache was written.
+
+    Each cached run carries its fingerprint (run_fingerprints); a run is recounted only
+    when that no longer matches, so rewriting the report with extra runs keeps the rest.
+    Runs without Cys peptides are cached as zero-count rows so they are not rescanned,
+    and left out of the result as before.
+    """
+    cache_path = cache_path or os.path.splitext(report_path)[0] + '.label_counts.csv'
+    runs = report_runs(report_path) if runs is None else list(runs)
+    fingerprints = run_fingerprints(report_path, runs)
+    cached = load_count_cache(cache_path)
+    current = cached.merge(fingerprints, on=['Run', 'Rows', 'Fingerprint'])
+    stale = fingerprints[~fingerprints['Run'].isin(current['Run'])]
+    if len(stale):
+        n_changed = stale['Run'].isin(cached['Run']).sum()
+        print(f"🧮 Counting labels for {len(stale) - n_changed} new and {n_changed} changed run(s); "
+              f"{len(current)} cached")
+        stale_runs = stale['Run'].tolist()
+        df_cys = read_report(report_path, columns=SEQUENCE_COLS, runs=stale_runs, cys_only=True)
+        new_counts = label_counts_per_run(df_cys).set_index('Run').reindex(stale_runs, fill_value=0)
+        new_counts = new_counts.rename_axis('Run').reset_index().merge(stale, on='Run')
+        # Runs not asked for this time keep their cached rows until they are requested
+        others = cached[~cached['Run'].isin(runs)]
+        cached = pd.concat([others, current, new_counts], ignore_index=True)[CACHE_COLS]
+        cached.to_csv(cache_path, index=False)
+    else:
+        cached = current
+    counts = cached[cached['Run'].isin(runs)].copy()
+    counts = counts[counts['Total_C_Peptides'].astype(int) > 0]
+    counts[COUNT_COLS[1:]] = counts[COUNT_COLS[1:]].astype(int)
+    return counts[COUNT_COLS].sort_values(by='Run').reset_index(drop=True)
+
+
+# === Expected vs observed reduced model (Curve.py) ===
+def reduced_model(counts):
+    df = counts.copy()
+
+    # Extract target % from run name
+    df['Target_%_Ox'] = df['Run'].str.extract(r'James_(\d+)_')[0].astype(int)
+
+    # Compute observed reduced states
+    df['Total_C_Labeled'] = df['Light_C'] + df['Heavy_C']
+    df['Total_C'] = df['Total_C_Labeled'] + df['Unlabeled_C']
+
+    df['Observed_Reduced_MS1'] = df['Light_C'] / df['Total_C']
+    df['Observed_Reduced_MS2'] = df['Light_C'] / (df['Light_C'] + df['Heavy_C'])  # MS2 proxy
+    df['Observed_Reduced_Combined'] = (df['Observed_Reduced_MS1'] + df['Observed_Reduced_MS2']) / 2
+
+    # Estimate average unlabeled from pure 0% and 100% sets
+    zero = df['Target_%_Ox'] == 0
+    hundred = df['Target_%_Ox'] == 100
+    avg_unlab_0 = (df.loc[zero, 'Unlabeled_C'] / df.loc[zero, 'Total_C_Peptides']).mean()
+    avg_unlab_100 = (df.loc[hundred, 'Unlabeled_C'] / df.loc[hundred, 'Total_C_Peptides']).mean()
+
+    # Linear mix model for expected unlabelled fraction
+    df['Expected_Unlabeled'] = (
+        (100 - df['Target_%_Ox']) * avg_unlab_0 +
+        df['Target_%_Ox'] * avg_unlab_100
+    ) / 100
+
+    # Expected reduced fraction: %reduced × (1 - unlabelled)
+    df['Expected_Reduced'] = df['Target_%_Ox'] / 100 * (1 - df['Expected_Unlabeled'])
+    return df
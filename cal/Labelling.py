@@ -1,34 +1,12 @@
-import pandas as pd
+from Report_access import read_report
+from Calibration import label_counts_per_run
 
-# Load full DIA-NN report
-df = pd.read_parquet('/content/drive/MyDrive/reportnewcal.parquet')
+# Load only the columns used here, keeping peptides with C during the scan
+df_cys = read_report('/content/drive/MyDrive/reportnewcal.parquet',
+                     columns=['Run', 'Stripped.Sequence', 'Modified.Sequence'], cys_only=True)
 
-# Only peptides with C
-df['Has_C'] = df['Stripped.Sequence'].str.contains("C")
-df_cys = df[df['Has_C']].copy()
-
-# Deduplicate per Run and Stripped.Sequence
-df_unique = df_cys.drop_duplicates(subset=['Run', 'Stripped.Sequence'])
-
-# Assign label type
-def get_label(seq):
-    if "_L" in seq:
-        return "L"
-    elif "_H" in seq:
-        return "H"
-    else:
-        return "None"
-
-df_unique['Label'] = df_unique['Modified.Sequence'].apply(get_label)
-
-# Summarize per run
-summary = df_unique.groupby('Run').agg(
-    Total_C_Peptides=('Stripped.Sequence', 'count'),
-    Light_C=('Label', lambda x: (x == 'L').sum()),
-    Heavy_C=('Label', lambda x: (x == 'H').sum())
-).reset_index()
-
-summary['Unlabeled_C'] = summary['Total_C_Peptides'] - summary['Light_C'] - summary['Heavy_C']
+# Deduplicate per Run and Stripped.Sequence and count Light / Heavy / Unlabeled per run (Calibration.py)
+summary = label_counts_per_run(df_cys)
 summary['%Unlabeled_C'] = (summary['Unlabeled_C'] / summary['Total_C_Peptides']) * 100
 
 # Filter to mixing runs (exclude pure 0 and 100)
@@ -0,0 +1,68 @@
+import os
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.ipc as ipc
+
+# Every column the calibration scripts (Signal.py, Labelling.py, Curve.py) read
+CALIBRATION_COLS = ['Run', 'Stripped.Sequence', 'Modified.Sequence', 'Ms1.Area', 'Precursor.Quantity']
+
+
+# === Slim Feather cache ===
+def cache_path_for(path):
+    return os.path.splitext(path)[0] + '.calibration.feather'
+
+
+def slim_cache(path, cache_path=None, columns=CALIBRATION_COLS):
+    """Feather copy of just the calibration columns; rebuilt when the report is newer.
+
+    Record batches are streamed from the Parquet report into the file, so building the
+    cache never holds the whole projection in memory; it is written under a temporary
+    name and renamed, so an interrupted build leaves no partial cache behind.
+    """
+    cache_path = cache_path or cache_path_for(path)
+    if not os.path.exists(cache_path) or os.path.getmtime(cache_path) < os.path.getmtime(path):
+        print(f"🗜️ Caching {len(columns)} calibration columns of {path} -> {cache_path}")
+        dataset = ds.dataset(path, format='parquet')
+        schema = pa.schema([dataset.schema.field(c) for c in columns])
+        options = ipc.IpcWriteOptions(compression='lz4')
+        tmp_path = cache_path + '.tmp'
+        with ipc.new_file(tmp_path, schema, options=options) as writer:
+            for batch in dataset.to_batches(columns=columns, batch_size=1_000_000):
+                writer.write_batch(batch)
+        os.replace(tmp_path, cache_path)
+    return cache_path
+
+
+# === Dataset access ===
+def report_filter(runs=None, cys_only=False):
+    """Row filter pushed down to the scan: Run membership and/or Cys-containing sequences."""
+    expr = None
+    if runs is not None:
+        expr = ds.field('Run').isin(list(runs))
+    if cys_only:
+        cys = pc.match_substring(ds.field('Stripped.Sequence'), 'C')
+        expr = cys if expr is None else expr & cys
+    return expr
+
+
+def report_dataset(path, columns=None, cache=True):
+    """The slim Feather cache when it covers `columns`, otherwise the Parquet report itself."""
+    if cache and columns is not None and set(columns) <= set(CALIBRATION_COLS):
+        return ds.dataset(slim_cache(path), format='feather')
+    return ds.dataset(path, format='parquet')
+
+
+def read_report(path, columns=CALIBRATION_COLS, runs=None, cys_only=False, cache=True):
+    """Read only `columns` of a DIA-NN main report, with Run / Cys filters applied during the scan."""
+    dataset = report_dataset(path, columns, cache)
+    return dataset.to_table(columns=columns, filter=report_filter(runs, cys_only)).to_pandas()
+
+
+def iter_report_batches(path, columns=CALIBRATION_COLS, runs=None, cys_only=False, cache=True,
+                        batch_size=1_000_000):
+    """Stream the same projection/filter as pandas chunks."""
+    dataset = report_dataset(path, columns, cache)
+    for batch in dataset.to_batches(columns=columns, filter=report_filter(runs, cys_only), batch_size=batch_size):
+        yield batch.to_pandas()
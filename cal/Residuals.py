@@ -1,57 +1,39 @@
 import pandas as pd
-import numpy as np
 import matplotlib.pyplot as plt
-from sklearn.metrics import r2_score, mean_squared_error, mean_absolute_error
+from Bootstrap_metrics import MODES, batched_metrics, bootstrap_metrics, print_metrics
 
 # === 1. Load your data ===
 # Replace with your actual CSV path
 df = pd.read_csv("redox_comparison.csv")  # Ensure columns: Expected_Reduced, Observed_Reduced_MS1, Observed_Reduced_MS2, Observed_Reduced_Combined
 
-# === 2. Safe MAPE implementation ===
-def safe_mape(y_true, y_pred):
-    y_true = np.array(y_true)
-    y_pred = np.array(y_pred)
-    mask = y_true != 0
-    if np.any(mask):
-        return np.mean(np.abs((y_pred[mask] - y_true[mask]) / y_true[mask]))
-    else:
-        return np.nan  # or 0 if you prefer
-
-# === 3. Define metric computation ===
+# === 2. Define metric computation ===
 def compute_metrics(observed, expected, label):
-    r2 = r2_score(expected, observed)
-    mse = mean_squared_error(expected, observed)
-    rmse = np.sqrt(mse)
-    mae = mean_absolute_error(expected, observed)
-    mape = safe_mape(expected, observed)  # <--- using safe version here
+    # Same values as the sklearn calls + safe MAPE, via the batched engine
+    metrics = batched_metrics(observed, expected)
     residuals = observed - expected
-    bias = np.mean(residuals)
-    sd_residuals = np.std(residuals)
 
     print(f"\nMetrics for {label}:")
-    print(f"  R²     = {r2:.4f}")
-    print(f"  RMSE   = {rmse:.4f}")
-    print(f"  MAE    = {mae:.4f}")
-    print(f"  MAPE   = {mape * 100:.2f}%")
-    print(f"  Bias   = {bias:.4f}")
-    print(f"  SD(residuals) = {sd_residuals:.4f}")
+    print(f"  R²     = {metrics['r2']:.4f}")
+    print(f"  RMSE   = {metrics['rmse']:.4f}")
+    print(f"  MAE    = {metrics['mae']:.4f}")
+    print(f"  MAPE   = {metrics['mape'] * 100:.2f}%")
+    print(f"  Bias   = {metrics['bias']:.4f}")
+    print(f"  SD(residuals) = {metrics['sd']:.4f}")
 
-    return {
-        "r2": r2,
-        "rmse": rmse,
-        "mae": mae,
-        "mape": mape,
-        "bias": bias,
-        "sd": sd_residuals,
-        "residuals": residuals
-    }
+    return {**{name: float(value) for name, value in metrics.items()}, "residuals": residuals}
 
-# === 4. Compute metrics for each mode ===
+# === 3. Compute metrics for each mode ===
 results = {}
 for col in ['Observed_Reduced_MS1', 'Observed_Reduced_MS2', 'Observed_Reduced_Combined']:
     label = col.split('_')[-1] if 'Combined' in col else col.split('_')[-1]
     results[label] = compute_metrics(df[col], df['Expected_Reduced'], label)
 
+# === 4. Bootstrap CIs (10k paired resamples, all modes and metrics at once) ===
+ci_df = bootstrap_metrics(df, n_boot=10_000, n_workers=1)
+for label in MODES:
+    print_metrics(ci_df, label)
+ci_df.to_csv("calibration_metrics_ci.csv", index=False)
+
 plt.figure(figsize=(10, 6))
 for label, color, marker in zip(['MS1', 'MS2', 'Combined'], ['blue', 'green', 'red'], ['o', 's', '^']):
     plt.scatter(df['Expected_Reduced'], results[label]['residuals'], label=f"{label} Residuals", color=color, marker=marker, alpha=0.7)
@@ -0,0 +1,70 @@
+from collections import defaultdict
+
+import numpy as np
+import pandas as pd
+from Report_access import iter_report_batches
+
+SUMMARY_COLS = ['Run', 'Total_Peptides', 'C_Peptides', 'Total_MS1', 'C_MS1', 'Total_MS2', 'C_MS2']
+REPORT_COLS = ['Run', 'Stripped.Sequence', 'Ms1.Area', 'Precursor.Quantity']
+
+
+# === Per-chunk aggregation ===
+def _prepare(df):
+    has_c = df['Stripped.Sequence'].str.contains('C', na=False).to_numpy()
+    ms1 = pd.to_numeric(df['Ms1.Area'], errors='coerce').fillna(0).to_numpy()
+    ms2 = pd.to_numeric(df['Precursor.Quantity'], errors='coerce').fillna(0).to_numpy()
+    return pd.DataFrame({
+        'Run': df['Run'].to_numpy(),
+        'Sequence': df['Stripped.Sequence'].to_numpy(),
+        'Has_C': has_c,
+        'Total_MS1': ms1,
+        'C_MS1': np.where(has_c, ms1, 0.0),
+        'Total_MS2': ms2,
+        'C_MS2': np.where(has_c, ms2, 0.0),
+    })
+
+
+def _intensity_sums(frame):
+    return frame.groupby('Run')[['Total_MS1', 'C_MS1', 'Total_MS2', 'C_MS2']].sum()
+
+
+def _finish(sums, peptide_counts):
+    summary_df = peptide_counts.join(sums, how='outer').fillna(0).reset_index()
+    summary_df[['Total_Peptides', 'C_Peptides']] = summary_df[['Total_Peptides', 'C_Peptides']].astype(np.int64)
+    return summary_df[SUMMARY_COLS].sort_values(by='Run').reset_index(drop=True)
+
+
+# === In-memory report ===
+def summarise_runs(df):
+    """Unique (Cys) peptide counts and MS1/MS2 totals for every run in one grouped pass."""
+    frame = _prepare(df)
+    pairs = frame[['Run', 'Sequence', 'Has_C']].dropna(subset=['Sequence']).drop_duplicates(['Run', 'Sequence'])
+    peptide_counts = pairs.groupby('Run').agg(Total_Peptides=('Sequence', 'size'), C_Peptides=('Has_C', 'sum'))
+    return _finish(_intensity_sums(frame), peptide_counts)
+
+
+# === Out-of-core report ===
+def summarise_runs_parquet(path, batch_size=1_000_000, runs=None, cache=True):
+    """Same summary, aggregated incrementally over record batches of the report.
+
+    Only the four needed columns are scanned (from the slim Feather cache when
+    `cache`), and only per-run intensity sums plus the set of distinct sequences
+    per run are held between batches.
+    """
+    sums = None
+    sequences = defaultdict(set)
+    for chunk in iter_report_batches(path, columns=REPORT_COLS, runs=runs, cache=cache, batch_size=batch_size):
+        frame = _prepare(chunk)
+        part = _intensity_sums(frame)
+        sums = part if sums is None else sums.add(part, fill_value=0)
+        pairs = frame[['Run', 'Sequence']].dropna().drop_duplicates()
+        for run, group in pairs.groupby('Run'):
+            sequences[run].update(group['Sequence'].tolist())
+
+    peptide_counts = pd.DataFrame(
+        [(run, len(seqs), sum('C' in s for s in seqs)) for run, seqs in sequences.items()],
+        columns=['Run', 'Total_Peptides', 'C_Peptides'],
+    ).set_index('Run')
+    if sums is None:
+        sums = _intensity_sums(_prepare(pd.DataFrame(columns=REPORT_COLS)))
+    return _finish(sums, peptide_counts)
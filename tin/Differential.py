@@ -0,0 +1,120 @@
+import numpy as np
+import pandas as pd
+from scipy.special import digamma, polygamma
+from scipy.stats import t as t_dist
+
+
+# === Batched paired t-test ===
+def paired_ttest(a, b):
+    """Row-wise scipy.stats.ttest_rel(a, b) over (sites, replicates) matrices.
+
+    Returns (t, p, dof) arrays; a site with zero-variance differences gives
+    t = ±inf / p = 0, or NaN when the differences are all zero, as scipy does.
+    """
+    d = np.asarray(a, dtype=np.float64) - np.asarray(b, dtype=np.float64)
+    n = d.shape[1]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t = d.mean(axis=1) / (d.std(axis=1, ddof=1) / np.sqrt(n))
+    dof = np.full(len(d), n - 1, dtype=np.float64)
+    return t, 2 * t_dist.sf(np.abs(t), dof), dof
+
+
+# === Empirical-Bayes moderated paired t-test (limma-style) ===
+def _trigamma_inverse(x):
+    """Solve trigamma(y) = x by Newton's method (Smyth 2004, as in limma)."""
+    if x > 1e7:
+        return 1 / np.sqrt(x)
+    if x < 1e-6:
+        return 1 / x
+    y = 0.5 + 1 / x
+    for _ in range(50):
+        tri = polygamma(1, y)
+        step = tri * (1 - tri / x) / polygamma(2, y)
+        y += step
+        if -step / y < 1e-8:
+            break
+    return y
+
+
+def fit_f_dist(s2, df):
+    """Prior degrees of freedom d0 and prior variance s0² from per-site variances (limma fitFDist).
+
+    d0 is inf when the variances are no more dispersed than chance, i.e. full pooling.
+    """
+    s2 = np.maximum(s2, 0)
+    median = np.median(s2)
+    s2 = np.maximum(s2, 1e-5 * (median if median > 0 else 1))
+    e = np.log(s2) - digamma(df / 2) + np.log(df / 2)
+    e_mean = e.mean()
+    e_var = e.var(ddof=1) - np.mean(polygamma(1, df / 2))
+    if e_var > 0:
+        d0 = 2 * _trigamma_inverse(e_var)
+        return d0, np.exp(e_mean + digamma(d0 / 2) - np.log(d0 / 2))
+    return np.inf, np.exp(e_mean)
+
+
+def moderated_paired_ttest(a, b):
+    """Paired t-test with per-site variances shrunk toward a prior fitted across all sites.
+
+    Returns (t, p, dof) with dof = residual df + prior df; zero-variance sites get a
+    finite moderated t instead of inf / NaN.
+    """
+    d = np.asarray(a, dtype=np.float64) - np.asarray(b, dtype=np.float64)
+    n = d.shape[1]
+    df_res = np.full(len(d), n - 1, dtype=np.float64)
+    s2 = d.var(axis=1, ddof=1)
+    d0, s0_2 = fit_f_dist(s2, df_res)
+    s2_post = s0_2 if np.isinf(d0) else (d0 * s0_2 + df_res * s2) / (d0 + df_res)
+    t = d.mean(axis=1) / np.sqrt(s2_post / n)
+    dof = df_res + d0
+    return t, 2 * t_dist.sf(np.abs(t), np.minimum(dof, 1e6)), dof
+
+
+# === Multiple testing ===
+def bh_adjust(p):
+    """Benjamini-Hochberg adjusted p-values; NaN p-values stay NaN and are not counted."""
+    p = np.asarray(p, dtype=np.float64)
+    adj = np.full(p.shape, np.nan)
+    valid = np.flatnonzero(~np.isnan(p))
+    order = valid[np.argsort(p[valid], kind='stable')]
+    scaled = p[order] * len(order) / np.arange(1, len(order) + 1)
+    adj[order] = np.minimum(np.minimum.accumulate(scaled[::-1])[::-1], 1)
+    return adj
+
+
+# === Site-wise differential table ===
+def sitewise_differential(df, cols_a, cols_b, labels=('Air', 'Tin'), eps=1e-6, moderated=False):
+    """Paired test, Δoxidation, log2FC and BH-adjusted p for every complete site, in one pass.
+
+    moderated=True uses the empirical-Bayes moderated t (prior fitted over these sites).
+    Sites with any missing replicate are dropped; the result keeps df's index.
+    """
+    values = df[list(cols_a) + list(cols_b)].to_numpy(dtype=np.float64)
+    complete = ~np.isnan(values).any(axis=1)
+    a, b = values[complete, :len(cols_a)], values[complete, len(cols_a):]
+
+    t, p, dof = (moderated_paired_ttest if moderated else paired_ttest)(a, b)
+    mean_a, mean_b = a.mean(axis=1), b.mean(axis=1)
+    return pd.DataFrame({
+        'Log2FC': np.log2((mean_a + eps) / (mean_b + eps)),
+        'p-value': p,
+        f'Mean_{labels[0]}': mean_a,
+        f'Mean_{labels[1]}': mean_b,
+        'Delta_Oxidation': mean_a - mean_b,
+        't': t,
+        'df': dof,
+        'adj_pval': bh_adjust(p),
+    }, index=df.index[complete])
+
+
+def run_contrasts(df, contrasts, eps=1e-6, moderated=False):
+    """sitewise_differential for many condition pairs; contrasts = {name: (cols_a, cols_b)}.
+
+    Returns one long table with a 'Contrast' column; BH correction is per contrast.
+    """
+    tables = []
+    for name, (cols_a, cols_b) in contrasts.items():
+        table = sitewise_differential(df, cols_a, cols_b, labels=('A', 'B'), eps=eps,
+                                      moderated=moderated)
+        tables.append(table.assign(Contrast=name))
+    return pd.concat(tables)
@@ -1,52 +1,36 @@
-import pandas as pd
 import numpy as np
 from scipy.stats import ttest_rel
+from Info_geometry import HistogramCache
 
-# === Step 1: Load data ===
-df = pd.read_csv('/content/redox_sites.tsv', sep='\t')
-
-# === Step 2: Define matched sample columns ===
+# === Step 1: Define matched sample columns ===
 air_cols = ['Sample_1_%Oxidized', 'Sample_2_%Oxidized', 'Sample_3_%Oxidized']
 tin_cols = ['Sample_4_%Oxidized', 'Sample_5_%Oxidized', 'Sample_6_%Oxidized']
 
-# === Step 3: Function to compute FIM between two distributions ===
-def compute_fim(x, y, bins=50):
-    # Drop NaNs
-    mask = ~x.isna() & ~y.isna()
-    x_vals = x[mask].values
-    y_vals = y[mask].values
-
-    # Bin values to estimate discrete distributions
-    hist_x, _ = np.histogram(x_vals, bins=bins, range=(0, 100), density=True)
-    hist_y, _ = np.histogram(y_vals, bins=bins, range=(0, 100), density=True)
-
-    # Normalize to probability distributions
-    P = hist_x / np.sum(hist_x)
-    Q = hist_y / np.sum(hist_y)
+# === Step 2: Shared histogram cache (Info_geometry.py) ===
+hist_cache = HistogramCache.from_tsv('/content/redox_sites.tsv', air_cols + tin_cols)
 
-    # Avoid division by zero or log of zero
-    mask = (P > 0) & (Q > 0)
-
-    # Fisher Information Metric (symmetric discrete form)
-    fim = np.sum((np.sqrt(P[mask]) - np.sqrt(Q[mask]))**2)
-    return fim
-
-# === Step 4: Compute FIM for each matched pair ===
-fim_values = []
-for air_col, tin_col in zip(air_cols, tin_cols):
-    fim = compute_fim(df[air_col], df[tin_col])
-    fim_values.append(fim)
+# === Step 3: Compute FIM for each matched pair (pairwise-complete sites) ===
+fim_df = hist_cache.pair_metrics(zip(air_cols, tin_cols), metrics=['fim'])
+fim_values = fim_df['fim'].tolist()
+for air_col, tin_col, fim in fim_df[['Sample_A', 'Sample_B', 'fim']].itertuples(index=False):
     print(f"FIM({air_col} vs {tin_col}): {fim:.4f}")
 
-# === Step 5: One-sample t-test vs 0 (null: no curvature difference) ===
+# === Step 4: One-sample t-test vs 0 (null: no curvature difference) ===
 t_stat, p_val = ttest_rel(fim_values, np.zeros_like(fim_values))
 mean_fim = np.mean(fim_values)
 std_fim = np.std(fim_values, ddof=1)
 cohen_d = mean_fim / std_fim
 
-# === Step 6: Report summary ===
+# === Step 5: Report summary ===
 print("\n=== Fisher Information Metric Summary ===")
 print(f"Mean FIM: {mean_fim:.4f}")
 print(f"Standard Deviation: {std_fim:.4f}")
 print(f"t = {t_stat:.4f}, p = {p_val:.4f}")
 print(f"Cohen's d: {cohen_d:.4f}")
+
+# === Permutation test: Air/Tin labels swapped per site (null of the metric itself) ===
+n_permutations = 10_000
+perm = hist_cache.permutation_test(air_cols, tin_cols, n_perm=n_permutations, metrics=['fim']).loc['fim']
+print(f"\n=== Permutation Test ({n_permutations} label swaps) ===")
+print(f"Mean FIM: {perm['Observed']:.4f} (null {perm['Null_Mean']:.4f} ± {perm['Null_SD']:.4f})")
+print(f"Permutation p = {perm['p_value']:.4f}")
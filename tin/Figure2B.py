@@ -1,7 +1,8 @@
 import pandas as pd
 import numpy as np
-from scipy.stats import ttest_rel
 import matplotlib.pyplot as plt
+# Batched site-wise statistics (Differential.py)
+from Differential import sitewise_differential
 
 # === Load your filtered dataframe with common sites ===
 df = pd.read_csv('/content/redox_sites.tsv', sep='\t')
@@ -9,45 +10,28 @@ df = pd.read_csv('/content/redox_sites.tsv', sep='\t')
 # === Confirm column names ===
 print("Columns:", df.columns.tolist())
 
-# === Map site identifier ===
-df['Site_ID'] = df['Protein'] + "_" + df['Residue'].astype(str)
-
 # === Define paired columns (based on Sample IDs) ===
 air_cols = ['Sample_1_%Oxidized', 'Sample_2_%Oxidized', 'Sample_3_%Oxidized']
 tin_cols = ['Sample_4_%Oxidized', 'Sample_5_%Oxidized', 'Sample_6_%Oxidized']
 
-results = []
-
-for idx, row in df.iterrows():
-    air_vals = row[air_cols].values.astype(float)
-    tin_vals = row[tin_cols].values.astype(float)
-
-    if np.isnan(air_vals).any() or np.isnan(tin_vals).any():
-        continue
+# True: limma-style moderated t/p (per-site variances shrunk toward a prior fitted over all sites)
+moderated = False
 
-    t_stat, p_val = ttest_rel(air_vals, tin_vals)
-    fc = np.mean(air_vals) - np.mean(tin_vals)
-    log2fc = np.log2((np.mean(air_vals) + 1e-6) / (np.mean(tin_vals) + 1e-6))
-
-    results.append({
-        'Site_ID': row['Site_ID'],
-        'Protein.Names': row.get('Protein.Names', ''),
-        'Gene.Names': row.get('Gene.Names', ''),
-        'Log2FC': log2fc,
-        'p-value': p_val,
-        'Mean_Air': np.mean(air_vals),
-        'Mean_Tin': np.mean(tin_vals),
-        'Delta_Oxidation': fc
-    })
+# === Paired t-test, Δoxidation, log2FC and BH for all sites in one pass ===
+stats_df = sitewise_differential(df, air_cols, tin_cols, labels=('Air', 'Tin'), moderated=moderated)
 
 # === Create volcano dataframe ===
-volcano_df = pd.DataFrame(results)
+sites = df.loc[stats_df.index]
+volcano_df = pd.DataFrame({
+    'Site_ID': sites['Protein'] + '_C' + sites['Site'].astype(str),
+    'Protein.Names': sites.get('Protein.Names', ''),
+    'Gene.Names': sites.get('Gene.Names', ''),
+}, index=sites.index).join(stats_df[['Log2FC', 'p-value', 'Mean_Air', 'Mean_Tin', 'Delta_Oxidation']])
 volcano_df['-log10(p-value)'] = -np.log10(volcano_df['p-value'])
 
-from statsmodels.stats.multitest import multipletests
-
-# Compute adjusted p-values (Benjamini-Hochberg)
-volcano_df['adj_pval'] = multipletests(volcano_df['p-value'], method='fdr_bh')[1]
+# Adjusted p-values (Benjamini-Hochberg), computed with the test
+volcano_df['adj_pval'] = stats_df['adj_pval']
+volcano_df = volcano_df.reset_index(drop=True)
 
 # Define significance threshold with FDR
 volcano_df['Significant'] = (volcano_df['adj_pval'] < 0.05) & (abs(volcano_df['Log2FC']) > 0.5)
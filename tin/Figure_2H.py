@@ -1,3 +1,13 @@
+import seaborn as sns
+import matplotlib.pyplot as plt
+from Info_geometry import AIR_COLS, TIN_COLS, HistogramCache
+
+# === All-vs-all Fisher–Rao distances (Info_geometry.py) ===
+# Each sample is histogrammed once; every Bhattacharyya coefficient comes from one matrix product
+sample_cols = AIR_COLS + TIN_COLS
+hist_cache = HistogramCache.from_tsv('/content/redox_sites.tsv', sample_cols)
+fisher_df = hist_cache.distance_matrix('fisher_rao')
+
 plt.figure(figsize=(10, 8))
 sns.set(style="whitegrid")
 
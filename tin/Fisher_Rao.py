@@ -1,52 +1,36 @@
-import pandas as pd
 import numpy as np
 from scipy.stats import ttest_rel
-from numpy import sqrt, sum, arccos, clip
+from Info_geometry import HistogramCache
 
-# === Step 1: Load the data ===
-df = pd.read_csv('/content/redox_sites.tsv', sep='\t')
-
-# === Step 2: Define matched sample columns ===
+# === Step 1: Define matched sample columns ===
 air_cols = ['Sample_1_%Oxidized', 'Sample_2_%Oxidized', 'Sample_3_%Oxidized']
 tin_cols = ['Sample_4_%Oxidized', 'Sample_5_%Oxidized', 'Sample_6_%Oxidized']
 
-# === Step 3: Fisher–Rao distance via Hellinger inner product ===
-def fisher_rao_distance(x, y, bins=50):
-    mask = ~x.isna() & ~y.isna()
-    x_vals = x[mask].values
-    y_vals = y[mask].values
-
-    hist_x, _ = np.histogram(x_vals, bins=bins, range=(0, 100), density=True)
-    hist_y, _ = np.histogram(y_vals, bins=bins, range=(0, 100), density=True)
-
-    P = hist_x / hist_x.sum()
-    Q = hist_y / hist_y.sum()
-
-    # Compute the Bhattacharyya coefficient
-    inner_product = np.sum(np.sqrt(P * Q))
+# === Step 2: Shared histogram cache (Info_geometry.py) ===
+hist_cache = HistogramCache.from_tsv('/content/redox_sites.tsv', air_cols + tin_cols)
 
-    # Clip to avoid numerical issues
-    inner_product = clip(inner_product, 0, 1)
-
-    # Fisher–Rao distance
-    return 2 * arccos(inner_product)
-
-# === Step 4: Compute Fisher–Rao distance for each matched pair ===
-fr_values = []
-for air_col, tin_col in zip(air_cols, tin_cols):
-    fr = fisher_rao_distance(df[air_col], df[tin_col])
-    fr_values.append(fr)
+# === Step 3: Fisher–Rao distance for each matched pair (pairwise-complete sites) ===
+fr_df = hist_cache.pair_metrics(zip(air_cols, tin_cols), metrics=['fisher_rao'])
+fr_values = fr_df['fisher_rao'].tolist()
+for air_col, tin_col, fr in fr_df[['Sample_A', 'Sample_B', 'fisher_rao']].itertuples(index=False):
     print(f"Fisher–Rao({air_col} vs {tin_col}): {fr:.4f}")
 
-# === Step 5: Stats ===
+# === Step 4: Stats ===
 t_stat, p_val = ttest_rel(fr_values, np.zeros_like(fr_values))
 mean_fr = np.mean(fr_values)
 std_fr = np.std(fr_values, ddof=1)
 cohen_d = mean_fr / std_fr
 
-# === Step 6: Report summary ===
+# === Step 5: Report summary ===
 print("\n=== Fisher–Rao Distance Summary ===")
 print(f"Mean Fisher–Rao: {mean_fr:.4f}")
 print(f"Standard Deviation: {std_fr:.4f}")
 print(f"t = {t_stat:.4f}, p = {p_val:.4f}")
 print(f"Cohen's d: {cohen_d:.4f}")
+
+# === Permutation test: Air/Tin labels swapped per site (null of the metric itself) ===
+n_permutations = 10_000
+perm = hist_cache.permutation_test(air_cols, tin_cols, n_perm=n_permutations, metrics=['fisher_rao']).loc['fisher_rao']
+print(f"\n=== Permutation Test ({n_permutations} label swaps) ===")
+print(f"Mean Fisher–Rao: {perm['Observed']:.4f} (null {perm['Null_Mean']:.4f} ± {perm['Null_SD']:.4f})")
+print(f"Permutation p = {perm['p_value']:.4f}")
@@ -0,0 +1,604 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+AIR_COLS = ['Sample_1_%Oxidized', 'Sample_2_%Oxidized', 'Sample_3_%Oxidized']
+TIN_COLS = ['Sample_4_%Oxidized', 'Sample_5_%Oxidized', 'Sample_6_%Oxidized']
+PAIR_METRICS = ['kl', 'fim', 'fisher_rao', 'mi', 'nmi', 'vi']
+MATRIX_METRICS = ['fisher_rao', 'hellinger', 'fim', 'kl', 'js']
+PERMUTATION_METRICS = ['shannon', 'kl', 'fim', 'fisher_rao', 'mi']
+
+
+# === Binning ===
+def _edge_codes(x, lo, hi, bins, right=False):
+    """Equal-width bin index of x in [lo, hi] by integer arithmetic on (x - lo) / width.
+
+    Edges are np.linspace(lo, hi, bins + 1) (lo / hi may be arrays broadcasting against x);
+    a value that lands on the wrong side of an edge after rounding is moved by one bin.
+    right=False gives np.histogram's [e_i, e_i+1) bins (last one closed), right=True
+    pd.cut's (e_i, e_i+1] bins (first one closed).
+    """
+    step = (hi - lo) / bins
+    codes = np.clip(((x - lo) * (bins / (hi - lo))).astype(np.int32), 0, bins - 1)
+    lower = codes * step + lo
+    upper = np.where(codes == bins - 1, hi, (codes + 1) * step + lo)
+    if right:
+        codes -= (x <= lower) & (codes != 0)
+        codes += x > upper
+    else:
+        codes -= x < lower
+        codes += (x >= upper) & (codes != bins - 1)
+    return codes
+
+
+def bin_codes(values, bins=50, value_range=(0, 100)):
+    """np.histogram bin index of every value (last bin closed); -1 for NaN or out of range."""
+    lo, hi = value_range
+    values = np.asarray(values, dtype=np.float64)
+    valid = (values >= lo) & (values <= hi)  # False for NaN
+    codes = _edge_codes(np.where(valid, values, lo), lo, hi, bins)
+    return np.where(valid, codes, -1).astype(np.int16)
+
+
+def range_codes(values, bins=50):
+    """pd.cut(values, bins, labels=False) along the last axis, without pd.cut; -1 for NaN.
+
+    Edges span each row's own [min, max] (widened by 0.1% when constant, as pd.cut
+    does) and bins are right-closed with the minimum in the first bin.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    valid = ~np.isnan(values)
+    lo = np.where(valid, values, np.inf).min(axis=-1, keepdims=True)
+    hi = np.where(valid, values, -np.inf).max(axis=-1, keepdims=True)
+    flat = lo == hi
+    pad = np.where(lo != 0, 0.001 * np.abs(lo), 0.001)
+    lo, hi = np.where(flat, lo - pad, lo), np.where(flat, hi + pad, hi)
+    lo, hi = np.where(np.isfinite(lo), lo, 0.0), np.where(np.isfinite(hi), hi, 1.0)  # all-NaN rows
+    codes = _edge_codes(np.where(valid, values, lo), lo, hi, bins, right=True)
+    return np.where(valid, codes, -1).astype(np.int16)
+
+
+def column_counts(codes, bins):
+    """Histograms of every column of a (sites, samples) code matrix with one offset bincount."""
+    n_cols = codes.shape[1]
+    valid = codes >= 0
+    offset = codes.astype(np.int64) + bins * np.arange(n_cols)
+    return np.bincount(offset[valid], minlength=bins * n_cols).reshape(n_cols, bins)
+
+
+# === Metrics on histograms ===
+def _safe_log(P):
+    return np.log(np.where(P > 0, P, 1))
+
+
+def probabilities(counts):
+    counts = np.asarray(counts, dtype=np.float64)
+    return counts / counts.sum(axis=-1, keepdims=True)
+
+
+def shannon_entropy(counts, bin_width):
+    """-sum(h log2 h) over the np.histogram(density=True) values h, as in Shannon.py."""
+    density = probabilities(counts) / bin_width
+    terms = np.where(density > 0, density * np.log2(np.where(density > 0, density, 1)), 0.0)
+    return -terms.sum(axis=-1)
+
+
+def kl_divergence(p_counts, q_counts):
+    """KL(P || Q) in nats over bins where both P and Q are non-zero, as in KL.py."""
+    P, Q = probabilities(p_counts), probabilities(q_counts)
+    both = (P > 0) & (Q > 0)
+    return np.where(both, P * np.log(np.where(both, P / np.where(both, Q, 1), 1)), 0.0).sum(axis=-1)
+
+
+def fim_distance(p_counts, q_counts):
+    """Squared Hellinger form sum((√P - √Q)²) over bins where both are non-zero, as in FIM.py."""
+    P, Q = probabilities(p_counts), probabilities(q_counts)
+    both = (P > 0) & (Q > 0)
+    return np.where(both, (np.sqrt(P) - np.sqrt(Q)) ** 2, 0.0).sum(axis=-1)
+
+
+def fisher_rao_distance(p_counts, q_counts):
+    """2·arccos of the Bhattacharyya coefficient, as in Fisher_Rao.py."""
+    P, Q = probabilities(p_counts), probabilities(q_counts)
+    return 2 * np.arccos(np.clip(np.sqrt(P * Q).sum(axis=-1), 0, 1))
+
+
+def joint_information(joint):
+    """(MI, H(X), H(Y)) in nats of joint count tables (..., bins, bins)."""
+    joint = np.asarray(joint, dtype=np.float64)
+    p = joint / joint.sum(axis=(-2, -1), keepdims=True)
+    px, py = p.sum(axis=-1), p.sum(axis=-2)
+    h_x = -np.where(px > 0, px * _safe_log(px), 0.0).sum(axis=-1)
+    h_y = -np.where(py > 0, py * _safe_log(py), 0.0).sum(axis=-1)
+    h_xy = -np.where(p > 0, p * _safe_log(p), 0.0).sum(axis=(-2, -1))
+    return h_x + h_y - h_xy, h_x, h_y
+
+
+def joint_mutual_information(joint):
+    """MI in nats of joint count tables (..., bins, bins)."""
+    return joint_information(joint)[0]
+
+
+def information_scores(joint):
+    """MI, normalised MI (MI / mean(H(X), H(Y)), as sklearn) and variation of information."""
+    mi, h_x, h_y = joint_information(joint)
+    mean_h = (h_x + h_y) / 2
+    with np.errstate(divide='ignore', invalid='ignore'):
+        nmi = np.where(mean_h > 0, mi / mean_h, 1.0)
+    return {'mi': mi, 'nmi': nmi, 'vi': np.clip(h_x + h_y - 2 * mi, 0, None)}
+
+
+def joint_counts(codes_x, codes_y, bins):
+    """Pairwise-complete (bins, bins) joint histogram from one bincount on x * bins + y."""
+    valid = (codes_x >= 0) & (codes_y >= 0)
+    joint = np.bincount(codes_x[valid].astype(np.int64) * bins + codes_y[valid], minlength=bins * bins)
+    return joint.reshape(bins, bins)
+
+
+def mutual_information(codes_x, codes_y, bins):
+    """MI in nats of two code vectors (pairwise-complete) from one joint bincount."""
+    return float(joint_mutual_information(joint_counts(codes_x, codes_y, bins)))
+
+
+def information_matrices(codes, bins, chunk_size=64):
+    """All-pairs MI / NMI / VI of the columns of a (sites, samples) code matrix.
+
+    Pairs are histogrammed `chunk_size` at a time with one offset bincount over the
+    cached codes (missing values in an extra bin, dropped before scoring).
+    """
+    n_cols = codes.shape[1]
+    size = bins + 1
+    filled = np.where(codes < 0, bins, codes).astype(np.int64)
+    rows, cols = np.triu_indices(n_cols)
+    out = {name: np.zeros((n_cols, n_cols)) for name in ('mi', 'nmi', 'vi')}
+    for start in range(0, len(rows), chunk_size):
+        i, j = rows[start:start + chunk_size], cols[start:start + chunk_size]
+        cells = filled[:, i] * size + filled[:, j] + np.arange(len(i)) * size * size
+        joint = np.bincount(cells.ravel(), minlength=len(i) * size * size).reshape(len(i), size, size)
+        scores = information_scores(joint[:, :bins, :bins])
+        for name, values in scores.items():
+            out[name][i, j] = values
+            out[name][j, i] = values
+    return out
+
+
+# === MI with data-driven edges ===
+def range_joint_counts(a, b, bins=50):
+    """(..., bins, bins) joint histograms of paired value arrays (..., sites), as Mutual_info.py bins them.
+
+    Sites missing either value are dropped, then each side is binned over its own
+    pairwise-complete range (range_codes); leading axes are pairs and/or permutations,
+    all histogrammed with one offset bincount.
+    """
+    a, b = np.asarray(a, dtype=np.float64), np.asarray(b, dtype=np.float64)
+    missing = np.isnan(a) | np.isnan(b)
+    codes_a = range_codes(np.where(missing, np.nan, a), bins).astype(np.int64)
+    codes_b = range_codes(np.where(missing, np.nan, b), bins).astype(np.int64)
+    lead_shape = a.shape[:-1]
+    n_tables = int(np.prod(lead_shape))
+    cells = (np.arange(n_tables).reshape(*lead_shape, 1) * bins + codes_a) * bins + codes_b
+    counts = np.bincount(cells[~missing], minlength=n_tables * bins * bins)
+    return counts.reshape(*lead_shape, bins, bins)
+
+
+def range_pair_information(df, pairs, bins=50):
+    """MI / NMI / VI of each column pair on Mutual_info.py's data-range bins."""
+    pairs = list(pairs)
+    a = df[[col_a for col_a, _ in pairs]].to_numpy(dtype=np.float64).T
+    b = df[[col_b for _, col_b in pairs]].to_numpy(dtype=np.float64).T
+    scores = information_scores(range_joint_counts(a, b, bins))
+    table = pd.DataFrame({'Sample_A': [p[0] for p in pairs], 'Sample_B': [p[1] for p in pairs]})
+    return table.assign(**{name: values for name, values in scores.items()})
+
+
+def range_information_matrices(df, cols, bins=50):
+    """All-pairs MI / NMI / VI on the same data-range bins, as labelled DataFrames."""
+    cols = list(cols)
+    rows, cols_j = np.triu_indices(len(cols))
+    values = df[cols].to_numpy(dtype=np.float64).T
+    scores = information_scores(range_joint_counts(values[rows], values[cols_j], bins))
+    matrices = {}
+    for name, upper in scores.items():
+        matrix = np.zeros((len(cols), len(cols)))
+        matrix[rows, cols_j] = upper
+        matrix[cols_j, rows] = upper
+        matrices[name] = pd.DataFrame(matrix, index=cols, columns=cols)
+    return matrices
+
+
+def _range_mi_chunk(a, b, bins, seed, n_perm):
+    swaps = np.random.default_rng(seed).random((n_perm, 1, a.shape[-1])) < 0.5
+    joint = range_joint_counts(np.where(swaps, b, a), np.where(swaps, a, b), bins)
+    return joint_mutual_information(joint).mean(axis=-1)
+
+
+def range_mi_permutation_test(df, cols_a, cols_b, n_perm=10_000, bins=50, seed=0, n_workers=1, chunk_size=100):
+    """Permutation p-value for the mean paired MI on the data-range bins, labels swapped per site.
+
+    Every permutation is re-binned over its own ranges, so the observed value is
+    exactly the reported mean MI. Seeds are per chunk, as in HistogramCache.permutation_test.
+    """
+    a = df[list(cols_a)].to_numpy(dtype=np.float64).T
+    b = df[list(cols_b)].to_numpy(dtype=np.float64).T
+    observed = joint_mutual_information(range_joint_counts(a, b, bins)).mean()
+    sizes = [min(chunk_size, n_perm - start) for start in range(0, n_perm, chunk_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    args = [(a, b, bins, s, n) for s, n in zip(seeds, sizes)]
+    if n_workers and n_workers > 1:
+        with ProcessPoolExecutor(max_workers=n_workers) as pool:
+            parts = list(pool.map(_range_mi_chunk, *zip(*args)))
+    else:
+        parts = [_range_mi_chunk(*arg) for arg in args]
+    null = np.concatenate(parts)
+    return pd.DataFrame([permutation_summary('mi', observed, null)]).set_index('Metric')
+
+
+# === All-pairs matrices ===
+def bhattacharyya_matrix(P):
+    """Every Bhattacharyya coefficient of the rows of P from one product of √P."""
+    root = np.sqrt(P)
+    return np.clip(root @ root.T, 0, 1)
+
+
+def divergence_matrix(P, metric='fisher_rao', chunk_size=64):
+    """(samples x samples) matrix of `metric` between the probability rows of P.
+
+    fisher_rao, hellinger and fim (FIM.py's both-non-zero Hellinger form) and kl
+    (KL.py's masked KL, row || column) reduce to matrix products. js (nats) needs
+    the mixture per pair, so it is broadcast over row chunks. Self-distances are
+    set to exactly 0 (the products round the Bhattacharyya coefficient just below 1).
+    """
+    P = np.asarray(P, dtype=np.float64)
+    support = (P > 0).astype(np.float64)
+    if metric == 'fisher_rao':
+        out = 2 * np.arccos(bhattacharyya_matrix(P))
+    elif metric == 'hellinger':
+        out = np.sqrt(np.clip(1 - bhattacharyya_matrix(P), 0, None))
+    elif metric == 'fim':
+        # sum over shared bins of p + q - 2√(pq)
+        shared_mass = P @ support.T
+        out = np.clip(shared_mass + shared_mass.T - 2 * bhattacharyya_matrix(P), 0, None)
+    elif metric == 'kl':
+        # sum over shared bins of p·log p - p·log q
+        out = (P * _safe_log(P)) @ support.T - P @ _safe_log(P).T
+    elif metric == 'js':
+        out = np.empty((len(P), len(P)))
+        plogp = (P * _safe_log(P)).sum(axis=1)
+        for start in range(0, len(P), chunk_size):
+            M = (P[start:start + chunk_size, None, :] + P[None, :, :]) / 2
+            mlogm = (M * _safe_log(M)).sum(axis=-1)
+            out[start:start + chunk_size] = (plogp[start:start + chunk_size, None] + plogp[None, :]) / 2 - mlogm
+        out = np.clip(out, 0, None)
+    else:
+        raise ValueError(f"Unknown metric {metric!r}; expected one of {MATRIX_METRICS}")
+    np.fill_diagonal(out, 0.0)
+    return out
+
+
+# === Permutation tests ===
+def paired_joint_counts(a_codes, b_codes, bins, swaps=None):
+    """Joint (A, B) code histograms of K paired columns, for R Air/Tin label assignments.
+
+    a_codes, b_codes are (sites, K); swaps is (R, sites) bool, True exchanging A and B at
+    that site in every pair. Missing values get an extra last bin, so one offset bincount
+    gives (R, K, bins + 1, bins + 1) tables holding both per-column and pairwise-complete counts.
+    """
+    size = bins + 1
+    swaps = np.zeros((1, len(a_codes)), dtype=bool) if swaps is None else swaps
+    a = np.where(a_codes < 0, bins, a_codes).astype(np.int64)
+    b = np.where(b_codes < 0, bins, b_codes).astype(np.int64)
+    n_assign, n_pairs = len(swaps), a.shape[1]
+    cells = np.where(swaps[:, :, None], (b * size + a)[None], (a * size + b)[None])
+    cells += (np.arange(n_assign)[:, None, None] * n_pairs + np.arange(n_pairs)[None, None, :]) * size * size
+    counts = np.bincount(cells.ravel(), minlength=n_assign * n_pairs * size * size)
+    return counts.reshape(n_assign, n_pairs, size, size)
+
+
+def paired_statistics(joint, bin_width, metrics=PERMUTATION_METRICS):
+    """Each metric averaged over the K pairs of paired_joint_counts() tables -> (R,) arrays.
+
+    shannon is mean entropy(A) - entropy(B); kl uses per-column histograms and
+    fim / fisher_rao / mi pairwise-complete ones, as in pair_metrics().
+    """
+    bins = joint.shape[-1] - 1
+    complete = joint[..., :bins, :bins]
+    P, Q = complete.sum(axis=-1), complete.sum(axis=-2)
+    col_a, col_b = joint[..., :bins, :].sum(axis=-1), joint[..., :, :bins].sum(axis=-2)
+    stats = {}
+    if 'shannon' in metrics:
+        stats['shannon'] = (shannon_entropy(col_a, bin_width) - shannon_entropy(col_b, bin_width)).mean(axis=-1)
+    if 'kl' in metrics:
+        stats['kl'] = kl_divergence(col_a, col_b).mean(axis=-1)
+    if 'fim' in metrics:
+        stats['fim'] = fim_distance(P, Q).mean(axis=-1)
+    if 'fisher_rao' in metrics:
+        stats['fisher_rao'] = fisher_rao_distance(P, Q).mean(axis=-1)
+    if 'mi' in metrics:
+        stats['mi'] = joint_mutual_information(complete).mean(axis=-1)
+    return stats
+
+
+def _permutation_chunk(a_codes, b_codes, bins, bin_width, metrics, seed, n_perm):
+    swaps = np.random.default_rng(seed).random((n_perm, len(a_codes))) < 0.5
+    return paired_statistics(paired_joint_counts(a_codes, b_codes, bins, swaps), bin_width, metrics)
+
+
+def permutation_summary(metric, observed, null):
+    """Observed value, null mean / SD and p-value; two-sided for the Shannon difference, else larger is extreme."""
+    extreme = np.abs(null) >= abs(observed) if metric == 'shannon' else null >= observed
+    return {
+        'Metric': metric,
+        'Observed': observed,
+        'Null_Mean': null.mean(),
+        'Null_SD': null.std(ddof=1),
+        'p_value': (1 + extreme.sum()) / (1 + len(null)),
+    }
+
+
+# === Histogram cache ===
+class HistogramCache:
+    """Bin codes and histograms of every sample column, binned once and shared by all metrics.
+
+    Shannon entropy and KL use each column on its own (NaNs dropped per column);
+    FIM, Fisher-Rao and MI use pairwise-complete sites, matching the original scripts.
+    """
+
+    def __init__(self, codes, cols, bins=50, value_range=(0, 100)):
+        self.codes = codes
+        self.cols = list(cols)
+        self.bins = bins
+        self.value_range = value_range
+        self.bin_width = (value_range[1] - value_range[0]) / bins
+        self.index = {col: j for j, col in enumerate(self.cols)}
+        self.column_counts = column_counts(codes, bins)
+        self._pairs = {}
+
+    @classmethod
+    def from_frame(cls, df, cols, bins=50, value_range=(0, 100)):
+        return cls(bin_codes(df[list(cols)].to_numpy(), bins, value_range), cols, bins, value_range)
+
+    @classmethod
+    def from_tsv(cls, path, cols, bins=50, value_range=(0, 100), cache=True, chunksize=200_000):
+        """Bin codes cached next to the TSV as <stem>.bins<bins>.npz; rebuilt when the TSV is newer.
+
+        The TSV is read in chunks and only int16 codes are kept, never the float matrix.
+        """
+        cache_path = os.path.splitext(path)[0] + f'.bins{bins}.npz'
+        if cache and os.path.exists(cache_path) and os.path.getmtime(cache_path) >= os.path.getmtime(path):
+            stored = np.load(cache_path, allow_pickle=False)
+            if list(stored['cols']) == list(cols) and tuple(stored['value_range']) == tuple(value_range):
+                return cls(stored['codes'], cols, bins, value_range)
+        chunks = pd.read_csv(path, sep='\t', usecols=list(cols), chunksize=chunksize)
+        codes = np.concatenate([bin_codes(chunk[list(cols)].to_numpy(), bins, value_range) for chunk in chunks])
+        hist_cache = cls(codes, cols, bins, value_range)
+        if cache:
+            np.savez(cache_path, codes=codes, cols=np.array(hist_cache.cols), value_range=np.array(value_range))
+        return hist_cache
+
+    @classmethod
+    def from_tsvs(cls, paths, cols, bins=50, value_range=(0, 100), cache=True, chunksize=200_000):
+        """from_tsv on every shard (each with its own code cache), codes stacked in shard order."""
+        shards = [cls.from_tsv(path, cols, bins, value_range, cache, chunksize) for path in paths]
+        return cls(np.concatenate([shard.codes for shard in shards]), cols, bins, value_range)
+
+    def counts(self, col):
+        return self.column_counts[self.index[col]]
+
+    def pair_counts(self, col_a, col_b):
+        """Histograms of both columns over sites present in both (cached per pair)."""
+        key = (col_a, col_b)
+        if key not in self._pairs:
+            a, b = self.codes[:, self.index[col_a]], self.codes[:, self.index[col_b]]
+            both = (a >= 0) & (b >= 0)
+            if both.all():
+                self._pairs[key] = (self.counts(col_a), self.counts(col_b))
+            else:
+                self._pairs[key] = tuple(column_counts(np.column_stack((a[both], b[both])), self.bins))
+        return self._pairs[key]
+
+    def entropy(self, cols=None):
+        cols = self.cols if cols is None else list(cols)
+        counts = self.column_counts[[self.index[c] for c in cols]]
+        return pd.Series(shannon_entropy(counts, self.bin_width), index=cols, name='Shannon_Entropy')
+
+    def pair_metrics(self, pairs, metrics=PAIR_METRICS):
+        """One row per (col_a, col_b) pair with every requested metric."""
+        rows = []
+        for col_a, col_b in pairs:
+            row = {'Sample_A': col_a, 'Sample_B': col_b}
+            P, Q = self.pair_counts(col_a, col_b)
+            if 'kl' in metrics:
+                row['kl'] = kl_divergence(self.counts(col_a), self.counts(col_b))
+            if 'fim' in metrics:
+                row['fim'] = fim_distance(P, Q)
+            if 'fisher_rao' in metrics:
+                row['fisher_rao'] = fisher_rao_distance(P, Q)
+            if {'mi', 'nmi', 'vi'} & set(metrics):
+                joint = joint_counts(self.codes[:, self.index[col_a]], self.codes[:, self.index[col_b]], self.bins)
+                scores = information_scores(joint)
+                row.update({name: float(scores[name]) for name in ('mi', 'nmi', 'vi') if name in metrics})
+            rows.append(row)
+        return pd.DataFrame(rows)
+
+    def distance_matrix(self, metric='fisher_rao', cols=None, pairwise_complete=False):
+        """All-vs-all `metric` as a labelled DataFrame, each sample histogrammed once.
+
+        Uses each column's own histogram; pairwise_complete=True instead re-bins every
+        pair over shared sites (same values when nothing is missing, O(S²) pair counts).
+        """
+        cols = self.cols if cols is None else list(cols)
+        if not pairwise_complete:
+            P = probabilities(self.column_counts[[self.index[c] for c in cols]])
+            return pd.DataFrame(divergence_matrix(P, metric), index=cols, columns=cols)
+        matrix = np.zeros((len(cols), len(cols)))
+        for i, col_a in enumerate(cols):
+            for j, col_b in enumerate(cols):
+                if i != j:
+                    P, Q = probabilities(np.stack(self.pair_counts(col_a, col_b)))
+                    matrix[i, j] = divergence_matrix(np.stack((P, Q)), metric)[0, 1]
+        return pd.DataFrame(matrix, index=cols, columns=cols)
+
+    def permutation_test(self, cols_a, cols_b, n_perm=10_000, metrics=PERMUTATION_METRICS, seed=0,
+                         n_workers=1, chunk_size=200):
+        """Permutation p-values for the mean paired metric, Air/Tin labels swapped per site.
+
+        Each chunk of `chunk_size` permutations is histogrammed with one offset bincount;
+        chunks have their own seeds, so results do not depend on n_workers. p-values are
+        one-sided (larger divergence / MI) and two-sided for the Shannon difference.
+        """
+        a_codes = self.codes[:, [self.index[c] for c in cols_a]]
+        b_codes = self.codes[:, [self.index[c] for c in cols_b]]
+        observed = paired_statistics(paired_joint_counts(a_codes, b_codes, self.bins), self.bin_width, metrics)
+
+        sizes = [min(chunk_size, n_perm - start) for start in range(0, n_perm, chunk_size)]
+        seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+        args = [(a_codes, b_codes, self.bins, self.bin_width, metrics, s, n) for s, n in zip(seeds, sizes)]
+        if n_workers and n_workers > 1:
+            with ProcessPoolExecutor(max_workers=n_workers) as pool:
+                parts = list(pool.map(_permutation_chunk, *zip(*args)))
+        else:
+            parts = [_permutation_chunk(*a) for a in args]
+
+        rows = [permutation_summary(metric, observed[metric][0], np.concatenate([part[metric] for part in parts]))
+                for metric in observed]
+        return pd.DataFrame(rows).set_index('Metric')
+
+    def information_matrices(self, cols=None):
+        """All-pairs MI / NMI / VI as labelled DataFrames, reusing the cached bin codes."""
+        cols = self.cols if cols is None else list(cols)
+        matrices = information_matrices(self.codes[:, [self.index[c] for c in cols]], self.bins)
+        return {name: pd.DataFrame(m, index=cols, columns=cols) for name, m in matrices.items()}
+
+    def sketch(self, pairs=()):
+        """The equivalent mergeable HistogramSketch (per-column counts plus `pairs` joint tables)."""
+        sketch = HistogramSketch(self.cols, self.bins, self.value_range, pairs)
+        sketch._add_codes(self.codes)
+        return sketch
+
+
+# === Mergeable streaming sketch ===
+class HistogramSketch:
+    """Fixed-bin histograms updated chunk by chunk and merged across shards or processes.
+
+    Keeps per-column counts (entropy, KL, divergence matrices) and, for the requested
+    `pairs`, (bins + 1)² joint tables with a missing-value bin (pairwise-complete FIM,
+    Fisher-Rao, MI). Memory does not grow with the number of sites.
+    """
+
+    def __init__(self, cols, bins=50, value_range=(0, 100), pairs=()):
+        self.cols = list(cols)
+        self.bins = bins
+        self.value_range = tuple(value_range)
+        self.bin_width = (value_range[1] - value_range[0]) / bins
+        self.index = {col: j for j, col in enumerate(self.cols)}
+        self.pairs = [tuple(pair) for pair in pairs]
+        self.column_counts = np.zeros((len(self.cols), bins), dtype=np.int64)
+        self.joint = np.zeros((len(self.pairs), bins + 1, bins + 1), dtype=np.int64)
+        self.n_sites = 0
+
+    def _add_codes(self, codes):
+        self.column_counts += column_counts(codes, self.bins)
+        if self.pairs:
+            a = codes[:, [self.index[a] for a, _ in self.pairs]]
+            b = codes[:, [self.index[b] for _, b in self.pairs]]
+            self.joint += paired_joint_counts(a, b, self.bins)[0]
+        self.n_sites += len(codes)
+
+    def update(self, chunk):
+        """Add a chunk of sites (DataFrame with the sample columns, or a (sites, samples) array)."""
+        values = chunk[self.cols].to_numpy() if isinstance(chunk, pd.DataFrame) else chunk
+        self._add_codes(bin_codes(values, self.bins, self.value_range))
+        return self
+
+    def merge(self, other):
+        if (other.cols, other.bins, other.value_range, other.pairs) != (self.cols, self.bins, self.value_range, self.pairs):
+            raise ValueError("Cannot merge sketches with different columns, bins, range or pairs")
+        merged = HistogramSketch(self.cols, self.bins, self.value_range, self.pairs)
+        merged.column_counts = self.column_counts + other.column_counts
+        merged.joint = self.joint + other.joint
+        merged.n_sites = self.n_sites + other.n_sites
+        return merged
+
+    __add__ = merge
+
+    @classmethod
+    def from_tsv(cls, path, cols, bins=50, value_range=(0, 100), pairs=(), chunksize=200_000):
+        """Stream one TSV shard; only `cols` are parsed, one chunk at a time."""
+        sketch = cls(cols, bins, value_range, pairs)
+        for chunk in pd.read_csv(path, sep='\t', usecols=list(cols), chunksize=chunksize):
+            sketch.update(chunk)
+        return sketch
+
+    @classmethod
+    def from_tsvs(cls, paths, cols, bins=50, value_range=(0, 100), pairs=(), chunksize=200_000, n_workers=1):
+        """Sketch every shard (in a process pool when n_workers > 1) and merge them."""
+        args = [(path, cols, bins, value_range, pairs, chunksize) for path in paths]
+        if n_workers and n_workers > 1:
+            with ProcessPoolExecutor(max_workers=n_workers) as pool:
+                sketches = list(pool.map(cls.from_tsv, *zip(*args)))
+        else:
+            sketches = [cls.from_tsv(*a) for a in args]
+        merged = sketches[0]
+        for sketch in sketches[1:]:
+            merged = merged.merge(sketch)
+        return merged
+
+    # --- Metrics ---
+    def counts(self, col):
+        return self.column_counts[self.index[col]]
+
+    def pair_counts(self, col_a, col_b):
+        complete = self.joint[self.pairs.index((col_a, col_b)), :self.bins, :self.bins]
+        return complete.sum(axis=1), complete.sum(axis=0)
+
+    def entropy(self, cols=None):
+        cols = self.cols if cols is None else list(cols)
+        counts = self.column_counts[[self.index[c] for c in cols]]
+        return pd.Series(shannon_entropy(counts, self.bin_width), index=cols, name='Shannon_Entropy')
+
+    def pair_metrics(self, pairs=None, metrics=PAIR_METRICS):
+        """Same table as HistogramCache.pair_metrics(); fim / fisher_rao / mi need `pairs` tracked."""
+        rows = []
+        for col_a, col_b in (self.pairs if pairs is None else pairs):
+            row = {'Sample_A': col_a, 'Sample_B': col_b}
+            if 'kl' in metrics:
+                row['kl'] = kl_divergence(self.counts(col_a), self.counts(col_b))
+            if {'fim', 'fisher_rao', 'mi', 'nmi', 'vi'} & set(metrics):
+                P, Q = self.pair_counts(col_a, col_b)
+                complete = self.joint[self.pairs.index((col_a, col_b)), :self.bins, :self.bins]
+                if 'fim' in metrics:
+                    row['fim'] = fim_distance(P, Q)
+                if 'fisher_rao' in metrics:
+                    row['fisher_rao'] = fisher_rao_distance(P, Q)
+                scores = information_scores(complete)
+                row.update({name: float(scores[name]) for name in ('mi', 'nmi', 'vi') if name in metrics})
+            rows.append(row)
+        return pd.DataFrame(rows)
+
+    def distance_matrix(self, metric='fisher_rao', cols=None):
+        cols = self.cols if cols is None else list(cols)
+        P = probabilities(self.column_counts[[self.index[c] for c in cols]])
+        return pd.DataFrame(divergence_matrix(P, metric), index=cols, columns=cols)
+
+
+if __name__ == '__main__':
+    # --- CONFIG ---
+    tsv_path = '/content/redox_sites.tsv'
+
+    # Every metric for the matched Air/Tin replicates from one binning pass
+    hist_cache = HistogramCache.from_tsv(tsv_path, AIR_COLS + TIN_COLS)
+    print("=== Shannon Entropy per Sample ===")
+    print(hist_cache.entropy())
+    print("\n=== Pairwise information metrics (Air vs Tin) ===")
+    print(hist_cache.pair_metrics(zip(AIR_COLS, TIN_COLS)))
+    print("\n=== Permutation tests (10,000 per-site label swaps) ===")
+    print(hist_cache.permutation_test(AIR_COLS, TIN_COLS, n_perm=10_000, n_workers=os.cpu_count()))
+
+    # Cohort-scale tables: stream shards chunk by chunk and merge the sketches
+    shard_paths = [tsv_path]
+    sketch = HistogramSketch.from_tsvs(shard_paths, AIR_COLS + TIN_COLS, pairs=list(zip(AIR_COLS, TIN_COLS)))
+    print(f"\n=== Streamed sketch ({sketch.n_sites} sites) ===")
+    print(sketch.entropy())
+    print(sketch.pair_metrics())
@@ -1,34 +1,23 @@
-import pandas as pd
 import numpy as np
-from scipy.special import rel_entr
 from scipy.stats import ttest_rel
-
-# === Load dataset ===
-df = pd.read_csv('/content/redox_sites.tsv', sep='\t')
+from Info_geometry import HistogramCache, HistogramSketch
 
 # === Define matched condition columns ===
 air_cols = ['Sample_1_%Oxidized', 'Sample_2_%Oxidized', 'Sample_3_%Oxidized']
 tin_cols = ['Sample_4_%Oxidized', 'Sample_5_%Oxidized', 'Sample_6_%Oxidized']
 
-# === Function to compute probability distribution from values ===
-def get_distribution(values, bins=50):
-    values = values.dropna().values
-    hist, _ = np.histogram(values, bins=bins, range=(0, 100), density=False)
-    prob = hist / hist.sum()
-    return prob
+# === Streaming histogram sketch (Info_geometry.py) ===
+# Per-shard fixed-bin counts, read chunk by chunk and merged; the full matrix is never loaded
+shard_paths = ['/content/redox_sites.tsv']  # one or more TSV shards with the same columns
+sketch = HistogramSketch.from_tsvs(shard_paths, air_cols + tin_cols)
 
 # === Compute KL divergence for each paired replicate ===
-kl_values = []
-for air_col, tin_col in zip(air_cols, tin_cols):
-    P = get_distribution(df[air_col])
-    Q = get_distribution(df[tin_col])
-    mask = (P > 0) & (Q > 0)
-    kl = np.sum(rel_entr(P[mask], Q[mask]))
-    kl_values.append(kl)
+kl_df = sketch.pair_metrics(zip(air_cols, tin_cols), metrics=['kl'])
+for air_col, tin_col, kl in kl_df[['Sample_A', 'Sample_B', 'kl']].itertuples(index=False):
     print(f"KL({air_col} || {tin_col}): {kl:.4f}")
 
 # === Summary statistics ===
-kl_values = np.array(kl_values)
+kl_values = kl_df['kl'].to_numpy()
 mean_kl = kl_values.mean()
 std_kl = kl_values.std(ddof=1)
 
@@ -42,3 +31,15 @@ print(f"Mean KL Divergence (Air || Tin): {mean_kl:.4f}")
 print(f"Standard Deviation: {std_kl:.4f}")
 print(f"t = {t_stat:.4f}, p = {p_val:.4f}")
 print(f"Cohen's d: {cohen_d:.4f}")
+
+# === Permutation test: Air/Tin labels swapped per site (null of the metric itself) ===
+# Per-site swaps need every site's bin codes: each shard is read in chunks and only its
+# int16 codes are kept (cached next to the shard), never the float matrix
+run_permutation = True
+n_permutations = 10_000
+if run_permutation:
+    hist_cache = HistogramCache.from_tsvs(shard_paths, air_cols + tin_cols)
+    perm = hist_cache.permutation_test(air_cols, tin_cols, n_perm=n_permutations, metrics=['kl']).loc['kl']
+    print(f"\n=== Permutation Test ({n_permutations} label swaps) ===")
+    print(f"Mean KL Divergence: {perm['Observed']:.4f} (null {perm['Null_Mean']:.4f} ± {perm['Null_SD']:.4f})")
+    print(f"Permutation p = {perm['p_value']:.4f}")
@@ -8,9 +8,6 @@ df = pd.read_csv('/content/redox_sites.tsv', sep='\t')
 air_cols = ['Sample_1_%Oxidized', 'Sample_2_%Oxidized', 'Sample_3_%Oxidized']
 tin_cols = ['Sample_4_%Oxidized', 'Sample_5_%Oxidized', 'Sample_6_%Oxidized']
 
-# === Map unique site identifier (optional) ===
-df['Site_ID'] = df['Protein'] + "_" + df['Residue'].astype(str)
-
 # === Keep rows with complete oxidation data ===
 df_shared = df.dropna(subset=air_cols + tin_cols).copy()
 
@@ -1,6 +1,15 @@
 import pandas as pd
 import requests
 
+# === Optional local proteome ===
+# Set to the UniProt FASTA(.gz) to read sequences from the compiled proteome store
+# (adipose/Proteome_store.py; needs adipose/ on the import path, see README) instead of the REST API.
+fasta_path = None
+proteome = None
+if fasta_path is not None:
+    from Proteome_store import load_proteome
+    proteome = load_proteome(fasta_path)
+
 # === Load File ===
 df = pd.read_csv("/content/annotated_cysteine_redox_table_sasa_fixed.csv")
 print(f"✅ Loaded {len(df)} annotated cysteine entries")
@@ -43,8 +52,13 @@ cys_counts = []
 for pid in df["Protein"].unique():
     try:
         print(f"\n🧬 Processing {pid}...")
-        seq = fetch_uniprot_sequence(pid)
-        cys_count = seq.count("C")
+        if proteome is not None and pid in proteome:
+            idx = proteome.index_of(pid)
+            seq = proteome.sequence_at(idx)
+            cys_count = int(proteome.cys_counts[idx])
+        else:
+            seq = fetch_uniprot_sequence(pid)
+            cys_count = seq.count("C")
         length = len(seq)
 
         subset = df[df["Protein"] == pid]
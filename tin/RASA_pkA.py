@@ -1,10 +1,12 @@
 # === 1. SETUP ===
 import os
+import json
 import requests
 import freesasa
 import subprocess
 import pandas as pd
 from Bio.PDB import PDBParser
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
 
 # === 2. FUNCTIONS ===
 def fetch_alphafold_structure(uniprot_id):
@@ -13,8 +15,12 @@ def fetch_alphafold_structure(uniprot_id):
         url = f"https://alphafold.ebi.ac.uk/files/AF-{uniprot_id}-F1-model_v4.pdb"
         response = requests.get(url)
         if response.status_code == 200:
-            with open(file_name, "w") as f:
+            # Write under a temporary name and rename, so a crash mid-write never leaves a
+            # truncated {id}.pdb that a resumed run would take as already downloaded
+            tmp_name = f"{file_name}.{os.getpid()}.tmp"
+            with open(tmp_name, "w") as f:
                 f.write(response.text)
+            os.replace(tmp_name, file_name)
         else:
             raise ValueError(f"Could not download AlphaFold model for {uniprot_id}")
     return file_name
@@ -55,48 +61,112 @@ def parse_propka_cysteine_accessibility(pka_file):
                     pka_dict[(chain_id, res_num.rjust(3))] = pKa_value
     return pka_dict
 
-def process_cysteines(uniprot_id, target_sites):
+def annotate_cysteines(uniprot_id, target_sites):
+    pdb_path = fetch_alphafold_structure(uniprot_id)
+    sasa_map = compute_cysteine_sasa(pdb_path)
+    propka_file = run_propka(pdb_path)
+    pka_map = parse_propka_cysteine_accessibility(propka_file)
+
+    results = []
+    for site in target_sites:
+        site_str = str(site).rjust(3)
+        for chain in ["A"]:  # AlphaFold always uses Chain A
+            key = (chain, site_str)
+            results.append({
+                "Protein": uniprot_id,
+                "Chain": chain,
+                "Site": site,
+                "SASA (Å^2)": sasa_map.get(key, "NA"),
+                "Predicted pKa": pka_map.get(key, "NA")
+            })
+    return results
+
+# === 3. PARALLEL, RESUMABLE RUNNER ===
+def _annotate_worker(uniprot_id, target_sites):
+    # Download + FreeSASA + PROPKA for one protein in a worker process; failures come back as records
     try:
-        pdb_path = fetch_alphafold_structure(uniprot_id)
-        sasa_map = compute_cysteine_sasa(pdb_path)
-        propka_file = run_propka(pdb_path)
-        pka_map = parse_propka_cysteine_accessibility(propka_file)
-
-        results = []
-        for site in target_sites:
-            site_str = str(site).rjust(3)
-            for chain in ["A"]:  # AlphaFold always uses Chain A
-                key = (chain, site_str)
-                results.append({
-                    "Protein": uniprot_id,
-                    "Chain": chain,
-                    "Site": site,
-                    "SASA (Å^2)": sasa_map.get(key, "NA"),
-                    "Predicted pKa": pka_map.get(key, "NA")
-                })
-        return results
+        return {"Protein": uniprot_id, "rows": annotate_cysteines(uniprot_id, target_sites)}
     except Exception as e:
-        print(f"Error processing {uniprot_id}: {e}")
-        return []
-
-# === 3. LOAD YOUR TSV FILE ===
-df_input = pd.read_csv("/content/algebraic_redox_transformation_table.tsv", sep="\t")
-print("Loaded dataset shape:", df_input.shape)
-
-# === 4. GROUP BY PROTEIN AND CYS SITE ===
-grouped = df_input.groupby("Protein")["Site"].apply(list).to_dict()
-
-# === 5. PROCESS EACH PROTEIN ===
-all_results = []
-for uniprot_id, sites in grouped.items():
-    print(f"Processing {uniprot_id} ({len(sites)} sites)...")
-    result = process_cysteines(uniprot_id, sites)
-    all_results.extend(result)
-
-# === 6. MERGE RESULTS WITH ORIGINAL TABLE ===
-df_annot = pd.DataFrame(all_results)
-df_merged = pd.merge(df_input, df_annot, on=["Protein", "Site"], how="left")
-
-# === 7. DONE: Show & Save ===
-df_merged.to_csv("/content/annotated_cysteine_redox_table.csv", index=False)
-df_merged.head(10)
+        return {"Protein": uniprot_id, "error": str(e)}
+
+def load_progress(progress_path):
+    """Per-protein records already streamed to the JSON-lines progress file (a torn last line is skipped)."""
+    records = {}
+    if os.path.exists(progress_path):
+        with open(progress_path) as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                records[record["Protein"]] = record
+    return records
+
+def run_annotation(grouped, progress_path, n_workers=None, max_pending=None, retry_failed=False):
+    """Annotate every protein in a process pool, appending each result to progress_path as it finishes.
+
+    Proteins already in the progress file are skipped, so a rerun after a crash resumes
+    where it stopped; retry_failed=True also reruns proteins recorded with an error.
+    At most max_pending (default 2 x workers) proteins are queued at once.
+    """
+    records = load_progress(progress_path)
+    todo = [(uniprot_id, sites) for uniprot_id, sites in grouped.items()
+            if uniprot_id not in records or (retry_failed and "error" in records[uniprot_id])]
+    print(f"Resuming: {len(grouped) - len(todo)} proteins done, {len(todo)} to annotate")
+
+    n_workers = n_workers or os.cpu_count()
+    max_pending = max_pending or 2 * n_workers
+    # Start on a fresh line if the last run died mid-write
+    if os.path.exists(progress_path) and os.path.getsize(progress_path) > 0:
+        with open(progress_path, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            torn = f.read(1) != b"\n"
+    else:
+        torn = False
+
+    queue = iter(todo)
+    pending = set()
+    n_done = 0
+    with ProcessPoolExecutor(max_workers=n_workers) as pool, open(progress_path, "a") as out:
+        if torn:
+            out.write("\n")
+        while True:
+            while len(pending) < max_pending:
+                item = next(queue, None)
+                if item is None:
+                    break
+                pending.add(pool.submit(_annotate_worker, *item))
+            if not pending:
+                break
+            finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                record = future.result()
+                out.write(json.dumps(record, default=lambda x: x.item()) + "\n")
+                out.flush()
+                records[record["Protein"]] = record
+                n_done += 1
+                status = f"error: {record['error']}" if "error" in record else f"{len(record['rows'])} sites"
+                print(f"Processed {record['Protein']} ({status}) [{n_done}/{len(todo)}]")
+
+    return [row for uniprot_id in grouped for row in records.get(uniprot_id, {}).get("rows", [])]
+
+if __name__ == '__main__':
+    # === 4. LOAD YOUR TSV FILE ===
+    df_input = pd.read_csv("/content/algebraic_redox_transformation_table.tsv", sep="\t")
+    print("Loaded dataset shape:", df_input.shape)
+
+    # === 5. GROUP BY PROTEIN AND CYS SITE ===
+    grouped = df_input.groupby("Protein")["Site"].apply(list).to_dict()
+
+    # === 6. PROCESS PROTEINS IN PARALLEL ===
+    # Results stream to the progress file; rerunning after a crash picks up where it stopped
+    progress_path = "/content/cysteine_annotation_progress.jsonl"
+    all_results = run_annotation(grouped, progress_path, n_workers=os.cpu_count())
+
+    # === 7. MERGE RESULTS WITH ORIGINAL TABLE ===
+    df_annot = pd.DataFrame(all_results, columns=["Protein", "Chain", "Site", "SASA (Å^2)", "Predicted pKa"])
+    df_merged = pd.merge(df_input, df_annot, on=["Protein", "Site"], how="left")
+
+    # === 8. DONE: Show & Save ===
+    df_merged.to_csv("/content/annotated_cysteine_redox_table.csv", index=False)
+    print(df_merged.head(10))
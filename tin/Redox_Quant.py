@@ -53,10 +53,23 @@ heavy_renames = {c: f"{os.path.basename(c).replace('.raw', '')}_H" for c in heav
 df_light.rename(columns=light_renames, inplace=True)
 df_heavy.rename(columns=heavy_renames, inplace=True)
 
-# === Step 9: Merge L and H ===
-df_light_sum = df_light.groupby(site_cols)[list(light_renames.values())].sum().reset_index()
-df_heavy_sum = df_heavy.groupby(site_cols)[list(heavy_renames.values())].sum().reset_index()
-df_redox = pd.merge(df_light_sum, df_heavy_sum, on=site_cols, how='outer').fillna(0)
+# === Step 9: Encode sites and merge L and H ===
+# Protein/Site pairs are factorized once into integer keys for the groupbys and merges, and
+# decoded back to Protein/Residue/Site on export. Rows without a Protein or Site have no key
+# (the Protein/Site groupby skipped them too)
+df_light = df_light.dropna(subset=['Protein', 'Site']).copy()
+df_heavy = df_heavy.dropna(subset=['Protein', 'Site']).copy()
+site_keys, site_index = pd.MultiIndex.from_frame(
+    pd.concat([df_light[['Protein', 'Site']], df_heavy[['Protein', 'Site']]], ignore_index=True)
+).factorize(sort=True)
+df_light['Site_Key'] = site_keys[:len(df_light)]
+df_heavy['Site_Key'] = site_keys[len(df_light):]
+site_residues = pd.concat([df_light[['Site_Key', 'Residue']], df_heavy[['Site_Key', 'Residue']]])
+site_residues = site_residues.drop_duplicates(subset='Site_Key').set_index('Site_Key')['Residue']
+
+df_light_sum = df_light.groupby('Site_Key')[list(light_renames.values())].sum()
+df_heavy_sum = df_heavy.groupby('Site_Key')[list(heavy_renames.values())].sum()
+df_redox = df_light_sum.join(df_heavy_sum, how='outer').fillna(0).reset_index()
 
 # === Step 10: Compute %Oxidized for each run ===
 run_names = sorted(set(c.replace('_L', '') for c in df_redox.columns if c.endswith('_L')))
@@ -80,19 +93,19 @@ oxi_col_map = {f"{run}_%Oxidized": sample_map[run] for run in run_names if run i
 sample_names = sorted(set(oxi_col_map.values()))
 
 # === Step 12: Identify cysteines quantified in all remaining technical runs ===
-df_oxi = df_redox[site_cols + oxi_cols].copy()
+df_oxi = df_redox[['Site_Key'] + oxi_cols].copy()
 mask_detected_all = df_oxi[oxi_cols].notna().all(axis=1)
 df_common = df_oxi[mask_detected_all].copy()
 
 # === Step 13: Average across technical replicates per sample ===
-df_common_avg = df_common[site_cols].copy()
+df_common_avg = df_common[['Site_Key']].copy()
 for sample in sample_names:
     sample_cols = [col for col, samp in oxi_col_map.items() if samp == sample]
     df_common_avg[f"{sample}_%Oxidized"] = df_common[sample_cols].mean(axis=1)
 
 # === Step 14: Add metadata ===
-df_meta = df_light[site_cols + meta_cols].drop_duplicates(subset=site_cols)
-df_common_avg = pd.merge(df_common_avg, df_meta, on=site_cols, how='left')
+df_meta = df_light[['Site_Key'] + meta_cols].drop_duplicates(subset='Site_Key')
+df_common_avg = pd.merge(df_common_avg, df_meta, on='Site_Key', how='left')
 
 # === Step 15: Compute summary ===
 summary = []
@@ -110,6 +123,11 @@ for sample in sample_names:
 summary_df = pd.DataFrame(summary)
 
 # === Step 16: Save outputs ===
+export_sites = site_index[df_common_avg['Site_Key'].to_numpy()]
+df_common_avg.insert(0, 'Protein', export_sites.get_level_values(0))
+df_common_avg.insert(1, 'Residue', site_residues.reindex(df_common_avg['Site_Key']).to_numpy())
+df_common_avg.insert(2, 'Site', export_sites.get_level_values(1))
+df_common_avg = df_common_avg.drop(columns='Site_Key')
 df_common_avg.to_csv('/content/redox_sites.tsv', sep='\t', index=False)
 summary_df.to_csv('/content/sample_summary.tsv', sep='\t', index=False)
 
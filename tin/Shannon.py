@@ -1,33 +1,22 @@
 import pandas as pd
 import numpy as np
 from scipy.stats import ttest_rel
-
-# === Load your filtered dataframe with common sites ===
-df = pd.read_csv('/content/redox_sites.tsv', sep='\t')
+from Info_geometry import HistogramCache, HistogramSketch
 
 # === Define correct columns for Air and Tin ===
 air_cols = ['Sample_1_%Oxidized', 'Sample_2_%Oxidized', 'Sample_3_%Oxidized']
 tin_cols = ['Sample_4_%Oxidized', 'Sample_5_%Oxidized', 'Sample_6_%Oxidized']
 
-# === Shannon entropy function ===
-def shannon_entropy(values, bins=50):
-    values = values.dropna()
-    hist, _ = np.histogram(values, bins=bins, range=(0, 100), density=True)
-    hist = hist[hist > 0]
-    return -np.sum(hist * np.log2(hist))
+# === Streaming histogram sketch (Info_geometry.py) ===
+# Each shard of the site table is read chunk by chunk into fixed-bin counts (50 bins
+# over [0, 100]) and the per-shard sketches are merged; the full matrix is never loaded
+shard_paths = ['/content/redox_sites.tsv']  # one or more TSV shards with the same columns
+sketch = HistogramSketch.from_tsvs(shard_paths, air_cols + tin_cols)
 
 # === Compute entropy for each run ===
-entropy_dict = {}
-air_entropy = []
-tin_entropy = []
-
-for col in air_cols + tin_cols:
-    entropy = shannon_entropy(df[col])
-    entropy_dict[col] = entropy
-    if col in air_cols:
-        air_entropy.append(entropy)
-    else:
-        tin_entropy.append(entropy)
+entropy_dict = sketch.entropy().to_dict()
+air_entropy = [entropy_dict[col] for col in air_cols]
+tin_entropy = [entropy_dict[col] for col in tin_cols]
 
 # === Paired t-test ===
 air_entropy = np.array(air_entropy)
@@ -51,3 +40,15 @@ print("\n=== Paired t-test (Shannon Entropy: Air vs Tin) ===")
 print(f"t = {t_stat:.4f}, p = {p_val:.4f}")
 print(f"Mean difference (Air - Tin): {mean_diff:.4f}")
 print(f"Cohen's d: {cohen_d:.4f}")
+
+# === Permutation test: Air/Tin labels swapped per site (null of the metric itself) ===
+# Per-site swaps need every site's bin codes: each shard is read in chunks and only its
+# int16 codes are kept (cached next to the shard), never the float matrix
+run_permutation = True
+n_permutations = 10_000
+if run_permutation:
+    hist_cache = HistogramCache.from_tsvs(shard_paths, air_cols + tin_cols)
+    perm = hist_cache.permutation_test(air_cols, tin_cols, n_perm=n_permutations, metrics=['shannon']).loc['shannon']
+    print(f"\n=== Permutation Test ({n_permutations} label swaps) ===")
+    print(f"Shannon Entropy difference (Air - Tin): {perm['Observed']:.4f} (null {perm['Null_Mean']:.4f} ± {perm['Null_SD']:.4f})")
+    print(f"Permutation p = {perm['p_value']:.4f}")
@@ -1,27 +1,27 @@
 import pandas as pd
 import numpy as np
-from sklearn.neighbors import NearestNeighbors
-from scipy.sparse import csgraph
-from scipy.linalg import eigh
 import matplotlib.pyplot as plt
+# Sparse graph / Lanczos engine (Spectral_graph.py)
+from Spectral_graph import (knn_edges, symmetrize, graph_laplacian, dirichlet_energy, morse_energy, laplacian_energy,
+                            low_spectrum, spectral_gap, spectral_density, density_curve, spectral_entropy)
 
 # === Load the redox data ===
 df = pd.read_csv('/content/redox_sites.tsv', sep='\t')
 
-# === Define site ID (if needed) ===
-df['Site_ID'] = df['Protein'] + "_" + df['Residue'].astype(str)
-
 # === Define sample columns explicitly ===
 air_cols = ['Sample_1_%Oxidized', 'Sample_2_%Oxidized', 'Sample_3_%Oxidized']
 tin_cols = ['Sample_4_%Oxidized', 'Sample_5_%Oxidized', 'Sample_6_%Oxidized']
+pct_cols = air_cols + tin_cols
 
 # Filter valid rows
-df = df.dropna(subset=pct_cols).copy()
+df = df.dropna(subset=pct_cols).reset_index(drop=True)
 df["Air_Mean"] = df[air_cols].mean(axis=1)
 df["Tin_Mean"] = df[tin_cols].mean(axis=1)
 
-# Sample to keep memory use low
-df = df.sample(n=12606, random_state=1).reset_index(drop=True)
+# Every site is kept: the graph and Laplacian stay sparse (~n*k non-zeros)
+n_modes = 100   # low eigenmodes from Lanczos
+n_probes = 30   # Hutchinson probes for the spectral density (more = lower variance)
+n_steps = 60    # Lanczos steps per probe (more = finer density)
 
 # Create 2D coordinates in a circle
 N = len(df)
@@ -32,32 +32,29 @@ z_tin = df["Tin_Mean"].values
 coords_air = np.column_stack((coords, z_air))
 coords_tin = np.column_stack((coords, z_tin))
 
-# Build kNN graph
-def build_knn(coords, k=5):
-    nn = NearestNeighbors(n_neighbors=k+1).fit(coords)
-    G = nn.kneighbors_graph(coords, mode='connectivity')
-    return G.toarray()
-
-G_air = build_knn(coords_air)
-G_tin = build_knn(coords_tin)
+# One kNN search per condition: directed edges K, symmetric graph G (both sparse CSR)
+K_air = knn_edges(coords_air)
+K_tin = knn_edges(coords_tin)
+G_air = symmetrize(K_air)
+G_tin = symmetrize(K_tin)
 
 # Laplacians
-L_air = csgraph.laplacian(G_air)
-L_tin = csgraph.laplacian(G_tin)
+L_air = graph_laplacian(G_air)
+L_tin = graph_laplacian(G_tin)
 
-# Dirichlet energies
-E_air = z_air @ L_air @ z_air
-E_tin = z_tin @ L_tin @ z_tin
+# Dirichlet energies (vectorised over the graph edges)
+E_air = dirichlet_energy(G_air, z_air)
+E_tin = dirichlet_energy(G_tin, z_tin)
 
-# Spectral decomposition
-eigvals_air = eigh(L_air, eigvals_only=True)
-eigvals_tin = eigh(L_tin, eigvals_only=True)
+# Low spectrum (shift-invert Lanczos)
+eigvals_air = low_spectrum(L_air, n_modes)
+eigvals_tin = low_spectrum(L_tin, n_modes)
 
 # Plot spectra
 plt.figure(figsize=(10, 5))
 plt.plot(eigvals_air, label="Air")
 plt.plot(eigvals_tin, label="Tin")
-plt.title("Spectral Eigenmodes (Air vs Tin)")
+plt.title(f"Spectral Eigenmodes (Air vs Tin, lowest {len(eigvals_air)})")
 plt.xlabel("Mode Index")
 plt.ylabel("Eigenvalue")
 plt.legend()
@@ -68,42 +65,41 @@ plt.show()
 print("Dirichlet Energy (Air):", E_air)
 print("Dirichlet Energy (Tin):", E_tin)
 
-def spectral_entropy(eigvals):
-    eigvals = eigvals[eigvals > 0]  # Avoid zero or negative eigenvalues
-    eigvals = eigvals / eigvals.sum()
-    return -np.sum(eigvals * np.log(eigvals))
+# Eigenvalue density by stochastic Lanczos quadrature, shared by entropy and the density plot
+density_air = spectral_density(L_air, n_probes, n_steps)
+density_tin = spectral_density(L_tin, n_probes, n_steps)
+
+grid = np.linspace(0, max(density_air[0].max(), density_tin[0].max()), 400)
+plt.figure(figsize=(10, 5))
+plt.plot(grid, density_curve(*density_air, grid), label="Air")
+plt.plot(grid, density_curve(*density_tin, grid), label="Tin")
+plt.title("Spectral Density (Air vs Tin)")
+plt.xlabel("Eigenvalue")
+plt.ylabel("Density")
+plt.legend()
+plt.tight_layout()
+plt.savefig('/content/spectral_density.png', dpi=300)
+plt.show()
 
-entropy_air = spectral_entropy(eigvals_air)
-entropy_tin = spectral_entropy(eigvals_tin)
+entropy_air = spectral_entropy(L_air, density=density_air)
+entropy_tin = spectral_entropy(L_tin, density=density_tin)
 print("Spectral Entropy (Air):", entropy_air)
 print("Spectral Entropy (Tin):", entropy_tin)
 
-gap_air = eigvals_air[1] - eigvals_air[0]
-gap_tin = eigvals_tin[1] - eigvals_tin[0]
+gap_air = spectral_gap(eigvals_air)
+gap_tin = spectral_gap(eigvals_tin)
 print("Spectral Gap (Air):", gap_air)
 print("Spectral Gap (Tin):", gap_tin)
 
-def laplacian_energy(eigvals):
-    mean = np.mean(eigvals)
-    return np.sum((eigvals - mean)**2)
-
-lap_energy_air = laplacian_energy(eigvals_air)
-lap_energy_tin = laplacian_energy(eigvals_tin)
+# Exact, from trace(L) and trace(L²)
+lap_energy_air = laplacian_energy(L_air)
+lap_energy_tin = laplacian_energy(L_tin)
 print("Laplacian Energy (Air):", lap_energy_air)
 print("Laplacian Energy (Tin):", lap_energy_tin)
 
-def morse_energy(coords, z, k=5):
-    nn = NearestNeighbors(n_neighbors=k+1).fit(coords)
-    distances, indices = nn.kneighbors(coords)
-    
-    energy = 0.0
-    for i in range(len(coords)):
-        for j in indices[i][1:]:  # skip self (index 0)
-            energy += (z[i] - z[j])**2
-    return energy / 2  # each pair counted twice
-
-morse_air = morse_energy(coords_air, z_air)
-morse_tin = morse_energy(coords_tin, z_tin)
+# Morse energies over the same directed kNN edges, no second neighbour search
+morse_air = morse_energy(K_air, z_air)
+morse_tin = morse_energy(K_tin, z_tin)
 
 print("Morse Energy (Air):", morse_air)
 print("Morse Energy (Tin):", morse_tin)
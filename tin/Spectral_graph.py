@@ -0,0 +1,132 @@
+import numpy as np
+from scipy.linalg import eigh_tridiagonal
+from scipy.sparse import csgraph, csr_matrix
+from scipy.sparse.linalg import eigsh
+from sklearn.neighbors import NearestNeighbors
+
+
+# === Sparse kNN graph ===
+# One neighbour search per condition gives the directed kNN edges K (CSR); the
+# symmetric adjacency, Laplacian and every edge functional are built from K.
+def knn_edges(coords, k=5):
+    """Directed kNN edges i -> j (first neighbour, i itself, skipped) as a 0/1 CSR matrix."""
+    nn = NearestNeighbors(n_neighbors=k + 1).fit(coords)
+    _, indices = nn.kneighbors(coords)
+    n = len(coords)
+    return csr_matrix((np.ones(n * k), indices[:, 1:].ravel(), np.arange(0, n * k + 1, k)), shape=(n, n))
+
+
+def symmetrize(K):
+    """Undirected adjacency: i~j if either lists the other; self edges dropped."""
+    G = K.maximum(K.T).tocsr()
+    G.setdiag(0)
+    G.eliminate_zeros()
+    return G
+
+
+def edge_arrays(G):
+    """(source, target, weight) arrays of every stored edge of a CSR graph."""
+    source = np.repeat(np.arange(G.shape[0]), np.diff(G.indptr))
+    return source, G.indices, G.data
+
+
+def graph_laplacian(G):
+    """Combinatorial Laplacian D - A, kept sparse."""
+    return csgraph.laplacian(G.astype(np.float64)).tocsr()
+
+
+# === Energies ===
+def edge_energy(G, z, f=np.square):
+    """1/2 * sum over stored edges of w_ij * f(z_i - z_j), as one vectorised reduction."""
+    source, target, weight = edge_arrays(G)
+    return 0.5 * float(np.sum(weight * f(z[source] - z[target])))
+
+
+def dirichlet_energy(G, z):
+    """z^T L z for symmetric G (each undirected edge is stored twice)."""
+    return edge_energy(G, z)
+
+
+def morse_energy(K, z):
+    """Squared differences over directed kNN edges, halved as pairs listed both ways count twice."""
+    return edge_energy(K, z)
+
+
+def laplacian_energy(L):
+    """sum((λ - mean λ)^2) without eigenvalues: trace(L²) - trace(L)² / n (L symmetric)."""
+    n = L.shape[0]
+    return float(L.multiply(L).sum() - L.diagonal().sum() ** 2 / n)
+
+
+# === Partial spectrum ===
+def low_spectrum(L, n_modes=100, sigma=-1e-3):
+    """The n_modes smallest eigenvalues by shift-invert Lanczos around `sigma`.
+
+    L is singular, so the shift sits just below 0 and L - sigma*I stays positive definite.
+    """
+    n_modes = min(n_modes, L.shape[0] - 1)
+    eigvals = eigsh(L, k=n_modes, sigma=sigma, which='LM', return_eigenvectors=False)
+    return np.sort(np.clip(eigvals, 0, None))
+
+
+def spectral_gap(eigvals):
+    return eigvals[1] - eigvals[0]
+
+
+# === Stochastic spectral density (Lanczos quadrature, Hutchinson probes) ===
+def spectral_density(L, n_probes=30, n_steps=60, seed=0):
+    """Gauss quadrature nodes/weights of the eigenvalue density of symmetric L.
+
+    All Rademacher probes run through Lanczos together (one sparse mat-mat per
+    step, no reorthogonalisation), so the cost is O(nnz * n_steps * n_probes).
+    Returns (nodes, weights), each (n_steps, n_probes): for any f,
+    tr f(L) ≈ n * mean over probes of sum(weights * f(nodes)). More probes lower
+    the variance; more steps resolve the density more finely.
+    """
+    n = L.shape[0]
+    n_steps = min(n_steps, n)
+    rng = np.random.default_rng(seed)
+    v = rng.choice([-1.0, 1.0], size=(n, n_probes)) / np.sqrt(n)
+    v_prev = np.zeros_like(v)
+    alpha = np.zeros((n_steps, n_probes))
+    beta = np.zeros((n_steps, n_probes))
+    for j in range(n_steps):
+        w = L @ v
+        alpha[j] = np.einsum('ij,ij->j', v, w)
+        w -= alpha[j] * v + (beta[j - 1] if j else 0) * v_prev
+        beta[j] = np.linalg.norm(w, axis=0)
+        # An exhausted Krylov space (beta ~ 0) leaves a decoupled block with zero weight
+        alive = beta[j] > 1e-10
+        v_prev, v = v, np.where(alive, w / np.where(alive, beta[j], 1), 0.0)
+
+    nodes = np.empty((n_steps, n_probes))
+    weights = np.empty((n_steps, n_probes))
+    for p in range(n_probes):
+        theta, vecs = eigh_tridiagonal(alpha[:, p], beta[:-1, p])
+        nodes[:, p] = theta
+        weights[:, p] = vecs[0] ** 2
+    return np.clip(nodes, 0, None), weights
+
+
+def density_trace(nodes, weights, f, n):
+    """tr f(L) from spectral_density(); returns (estimate, standard error over probes)."""
+    per_probe = n * np.sum(weights * f(nodes), axis=0)
+    return per_probe.mean(), per_probe.std(ddof=1) / np.sqrt(len(per_probe))
+
+
+def density_curve(nodes, weights, grid, bandwidth=0.1):
+    """Gaussian-smoothed eigenvalue density on `grid` (integrates to 1)."""
+    kernel = np.exp(-0.5 * ((grid[:, None] - nodes.ravel()[None, :]) / bandwidth) ** 2)
+    return kernel @ weights.ravel() / (weights.shape[1] * bandwidth * np.sqrt(2 * np.pi))
+
+
+def spectral_entropy(L, n_probes=30, n_steps=60, seed=0, density=None):
+    """-sum(p log p) with p = λ / sum(λ) over λ > 0, i.e. log tr(L) - tr(L log L) / tr(L).
+
+    tr(L) is exact; tr(L log L) comes from the stochastic density.
+    """
+    nodes, weights = density if density is not None else spectral_density(L, n_probes, n_steps, seed)
+    total = L.diagonal().sum()
+    xlogx = lambda x: np.where(x > 0, x * np.log(np.where(x > 0, x, 1)), 0.0)
+    trace_xlogx, _ = density_trace(nodes, weights, xlogx, L.shape[0])
+    return float(np.log(total) - trace_xlogx / total)